@@ -0,0 +1,83 @@
+from collections.abc import Iterable, Sequence
+from typing import Final
+
+from domain.value_objects.image_hash import ImageHash
+
+
+class HashPrefixFilter:
+    """ハッシュの先頭24bitによるビットマッププレフィルタ
+
+    登録済みハッシュの先頭24bitに対応するビットを立てておき、
+    ビットが立っていないハッシュは「未登録」と確定できるようにする。
+    ビットが立っている場合は偽陽性があり得るため、リポジトリで厳密に確認する必要がある。
+
+    ビットマップのサイズは 2^24 bit = 2MiB で固定。
+
+    Example:
+        >>> prefix_filter = HashPrefixFilter.from_prefixes(images_repo.list_hash_prefixes(HashPrefixFilter.PREFIX_BITS))
+        >>> prefix_filter.might_contain(image_entry.hash)
+        False
+    """
+
+    PREFIX_BITS: Final[int] = 24
+    _PREFIX_HEX_LENGTH: Final[int] = PREFIX_BITS // 4
+
+    def __init__(self) -> None:
+        self._bitmap = bytearray(1 << (self.PREFIX_BITS - 3))
+
+    @classmethod
+    def from_hash_values(cls, hash_values: Iterable[ImageHash | str]) -> "HashPrefixFilter":
+        """ハッシュのリストからプレフィルタを作成する
+
+        Args:
+            hash_values(Iterable[ImageHash | str]): 登録済みのハッシュ
+
+        Returns:
+            HashPrefixFilter: プレフィルタ
+        """
+        prefix_filter = cls()
+        prefix_filter.add_many(hash_values)
+        return prefix_filter
+
+    @classmethod
+    def from_prefixes(cls, prefixes: Sequence[int]) -> "HashPrefixFilter":
+        """ハッシュの先頭24bitの値の配列からプレフィルタを作成する
+
+        登録済みのハッシュが多い場合に、ハッシュ値の文字列を経由せずにビットマップを作成できる。
+
+        Args:
+            prefixes(Sequence[int]): 登録済みのハッシュの先頭24bitの値(numpy配列など)
+
+        Returns:
+            HashPrefixFilter: プレフィルタ
+        """
+        import numpy as np
+
+        prefix_filter = cls()
+        prefix_array = np.asarray(prefixes, dtype=np.uint32)
+        bitmap = np.frombuffer(prefix_filter._bitmap, dtype=np.uint8)
+        # 同じバイトに複数のビットを立てる場合があるため、bitwise_or.atで重複するインデックスも累積させる
+        np.bitwise_or.at(bitmap, prefix_array >> 3, np.left_shift(1, prefix_array & 7).astype(np.uint8))
+        return prefix_filter
+
+    def _prefix(self, hash_value: ImageHash | str) -> int:
+        return int(str(hash_value)[: self._PREFIX_HEX_LENGTH], 16)
+
+    def add(self, hash_value: ImageHash | str) -> None:
+        """ハッシュを登録する"""
+        prefix = self._prefix(hash_value)
+        self._bitmap[prefix >> 3] |= 1 << (prefix & 7)
+
+    def add_many(self, hash_values: Iterable[ImageHash | str]) -> None:
+        """複数のハッシュを登録する"""
+        for hash_value in hash_values:
+            self.add(hash_value)
+
+    def might_contain(self, hash_value: ImageHash | str) -> bool:
+        """ハッシュが登録済みの可能性があるかどうか
+
+        Returns:
+            bool: Falseなら未登録で確定。Trueの場合は偽陽性の可能性がある
+        """
+        prefix = self._prefix(hash_value)
+        return bool(self._bitmap[prefix >> 3] & (1 << (prefix & 7)))
@@ -1,3 +1,6 @@
+from typing import Final
+
+from application.service.hash_prefix_filter import HashPrefixFilter
 from domain.entities.images import ImageEntry
 from domain.repositories.images import ImagesRepository
 
@@ -5,20 +8,38 @@ from domain.repositories.images import ImagesRepository
 class ImageDeduplicationService:
     """画像の重複チェック・除外するサービス"""
 
-    @staticmethod
+    # 1回の問い合わせに含めるハッシュの最大数
+    HASH_QUERY_CHUNK_SIZE: Final[int] = 1000
+
+    @classmethod
     def filter_duplicates(
+        cls,
         image_entries: list[ImageEntry],
         images_repo: ImagesRepository,
+        prefix_filter: HashPrefixFilter | None = None,
     ) -> list[ImageEntry]:
         """既存の画像ハッシュのセットと比較して重複を除外する
 
+        ハッシュの問い合わせはHASH_QUERY_CHUNK_SIZE件ずつに分割して行う。
+        prefix_filterが指定された場合は、登録済みの可能性があるハッシュのみをリポジトリに問い合わせる。
+
         Args:
             image_entries(list[ImageEntry]): 画像エントリーのリスト
             images_repo(ImagesRepository): 画像リポジトリ
+            prefix_filter(HashPrefixFilter | None): 登録済みハッシュのプレフィルタ
 
         Returns:
             list[ImageEntry]: 重複を除外した画像エントリーのリスト
         """
-        existing_image_entries = images_repo.find_by_hashes([entry.hash for entry in image_entries])
-        existing_hash_set = {entry.hash for entry in existing_image_entries}
-        return [entry for entry in image_entries if entry.hash not in existing_hash_set]
+        hashes = [entry.hash for entry in image_entries]
+        if prefix_filter is not None:
+            hashes = [hash_value for hash_value in hashes if prefix_filter.might_contain(hash_value)]
+
+        chunk_size = cls.HASH_QUERY_CHUNK_SIZE
+
+        # 画像のレコード全体ではなくハッシュのみを問い合わせる
+        existing_hash_values: set[str] = set()
+        for i in range(0, len(hashes), chunk_size):
+            existing_hash_values |= images_repo.find_existing_hash_values(hashes[i : i + chunk_size])
+
+        return [entry for entry in image_entries if entry.hash.value not in existing_hash_values]
@@ -4,6 +4,7 @@ from logging import getLogger
 from PIL import Image, UnidentifiedImageError
 
 from application.storage.ports import Storage
+from common.image.header import parse_image_size
 from domain.entities.images import ImageEntry, ImageMetadataFactory
 from domain.value_objects.file_location import FileLocation
 from domain.value_objects.image_size import ImageSize
@@ -39,12 +40,17 @@ class ImageMetadataExtractor:
         """
         try:
             image_binary = image_binary or self._storage.read_binary(image_file)
-            image = Image.open(BytesIO(image_binary))
-            file_size = self._storage.get_size(image_file)
+            # 主要な形式はヘッダを直接解析し、それ以外の形式のみPILで開く(Image.openもヘッダのみを解析する)
+            # ファイルサイズも読み込んだバイナリから求め、ファイルを再度参照しない
+            size = parse_image_size(image_binary)
+            if size is None:
+                image = Image.open(BytesIO(image_binary))
+                size = (image.width, image.height)
+            file_size = len(image_binary)
             file_type = self._storage.get_file_extension(image_file)
 
             file_location = FileLocation(image_file)
-            image_size = ImageSize(width=image.width, height=image.height)
+            image_size = ImageSize(width=size[0], height=size[1])
 
             metadata = ImageMetadataFactory.create(
                 file_location=file_location,
@@ -4,7 +4,7 @@ from domain.entities.images import ImageEntry
 from domain.tagger.result import TaggerResult
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TaggedImageEntry:
     """タグ付け済みの画像エントリー"""
 
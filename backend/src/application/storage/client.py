@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 from application.storage.ports import Storage as StoragePort
 from application.storage.ports import StorageAccessor, StorageOperator
 
@@ -14,12 +16,21 @@ class Storage(StoragePort):
     def list_files(self, path: str, recursive: bool = False) -> list[str]:
         return self._accessor.list_files(path, recursive)
 
+    def iter_files(self, path: str, recursive: bool = False) -> Iterator[str]:
+        return self._accessor.iter_files(path, recursive)
+
     def exists(self, path: str, *, follow_symlinks: bool = True) -> bool:
         return self._accessor.exists(path, follow_symlinks=follow_symlinks)
 
     def get_size(self, path: str) -> int:
         return self._accessor.get_size(path)
 
+    def get_mtime(self, path: str) -> float:
+        return self._accessor.get_mtime(path)
+
+    def stat(self, path: str) -> tuple[int, float]:
+        return self._accessor.stat(path)
+
     def read_binary(self, path: str) -> bytes:
         return self._accessor.read_binary(path)
 
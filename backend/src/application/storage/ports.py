@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from typing import Protocol
 
 
@@ -6,10 +7,16 @@ class StorageAccessor(Protocol):
 
     def list_files(self, path: str, recursive: bool = False) -> list[str]: ...
 
+    def iter_files(self, path: str, recursive: bool = False) -> Iterator[str]: ...
+
     def exists(self, path: str, *, follow_symlinks: bool = True) -> bool: ...
 
     def get_size(self, path: str) -> int: ...
 
+    def get_mtime(self, path: str) -> float: ...
+
+    def stat(self, path: str) -> tuple[int, float]: ...
+
     def read_binary(self, path: str) -> bytes: ...
 
     def read_text(self, path: str, encoding: str = "utf-8") -> str: ...
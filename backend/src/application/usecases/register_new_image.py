@@ -1,17 +1,25 @@
 """新規画像登録サービス"""
 
+import itertools
+import threading
+
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
 from logging import getLogger
-from typing import Final
+from typing import Any, Final
 
+from application.service.hash_prefix_filter import HashPrefixFilter
 from application.service.image_deduplication import ImageDeduplicationService
 from application.service.image_metadata_extractor import ImageMetadataExtractor
-from application.service.tagging_result_classifier import TaggingResultClassifier
+from application.service.tagging_result_classifier import TaggedImageEntry, TaggingResultClassifier
 from application.storage.ports import Storage
 from common.concurrency import parallel
+from common.concurrency.write_behind import WriteBehindQueue
 from common.decorators.chunk_processor import ChunkInfo, chunk_processor
+from domain.entities.hash_cache import HashCacheEntry
 from domain.entities.images import ImageEntry
 from domain.entities.model_tag import ModelTagEntries
+from domain.exceptions import TaggingError
 from domain.repositories.unit_of_work import UnitOfWorkProtocol
 from domain.tagger.result import TaggerResult
 from domain.tagger.tagger import Tagger
@@ -21,7 +29,7 @@ from domain.value_objects.image_hash import ImageHash
 logger = getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _ImageEntryBinaryPair:
     """画像エントリーと画像バイナリのペア"""
 
@@ -57,12 +65,21 @@ class RegisterNewImageUsecase:
     """新規画像登録ユースケース"""
 
     REQUIRED_REPOSITORIES: Final[list[str]] = ["images", "model_tag"]
+    # 1チャンクで処理する画像ファイル数の既定値
+    DEFAULT_CHUNK_SIZE: Final[int] = 1000
+    # 書き込み待ちにできるチャンク数の上限
+    WRITE_BEHIND_QUEUE_SIZE: Final[int] = 4
+    # 画像ごとの推論を同時に実行する数の既定値
+    # NOTE: ONNX Runtimeは1回の推論をintra-opスレッドで全コアに分散するため、CPU数に合わせて増やすと過剰になる
+    DEFAULT_INFERENCE_WORKERS: Final[int] = 4
 
     def __init__(
         self,
         unit_of_work: UnitOfWorkProtocol,
         tagger: Tagger,
         storage: Storage,
+        use_hash_prefilter: bool = False,
+        use_hash_cache: bool = False,
     ) -> None:
         """RegisterNewImageUsecaseを初期化する
 
@@ -72,31 +89,200 @@ class RegisterNewImageUsecase:
                 - model_tag(ModelTagRepository): モデルタグリポジトリ
             tagger(Tagger): タグ付けモデル
             storage(Storage): ストレージ
+            use_hash_prefilter(bool): 登録済みハッシュのプレフィルタで重複チェックの問い合わせを減らすかどうか
+            use_hash_cache(bool): ファイルごとのハッシュのキャッシュを使い、変更のない登録済みファイルの読み込みを省くかどうか
+                有効な場合はUnit of Workに次のリポジトリも必要:
+                - hash_cache(HashCacheRepository): 画像ハッシュキャッシュリポジトリ
         """
-        self.unit_of_work = unit_of_work.subset(self.REQUIRED_REPOSITORIES)
+        repository_names = [*self.REQUIRED_REPOSITORIES, "hash_cache"] if use_hash_cache else self.REQUIRED_REPOSITORIES
+        self.unit_of_work = unit_of_work.subset(repository_names)
         self.tagger = tagger
         self.storage = storage
+        # NOTE: メタデータ抽出はスレッドプールで行う。ハッシュ計算(hashlib)は大きなバイナリに対してGILを解放し、
+        #       PILはヘッダのみを読むため、プロセスプールにしてもバイナリのプロセス間転送のコストが上回る
+        self._metadata_extractor = ImageMetadataExtractor(storage=storage)
+        self.use_hash_prefilter = use_hash_prefilter
+        self.use_hash_cache = use_hash_cache
+        self._hash_prefix_filter: HashPrefixFilter | None = None
+
+        # 永続化は書き込みスレッドで行うため、重複チェックと書き込み待ちのハッシュの整合性を保つようDBアクセスはロックで直列化する
+        self._db_lock = threading.Lock()
+        # 書き込みキューに投入済みでまだコミットされていない画像のハッシュ
+        self._pending_hashes: set[ImageHash] = set()
+        self._writer: WriteBehindQueue[list[TaggedImageEntry]] | None = None
+        # 書き込みスレッド用のUnit of Work(接続は書き込みスレッド専用のカーソル)
+        self._writer_unit_of_work: UnitOfWorkProtocol | None = None
 
     def _extract_metadata(self, image_file: str) -> _ImageEntryBinaryPair:
         image_binary = self.storage.read_binary(image_file)
-        image_entry = ImageMetadataExtractor(storage=self.storage).extract_from_file(image_file, image_binary)
+        image_entry = self._metadata_extractor.extract_from_file(image_file, image_binary)
         return _ImageEntryBinaryPair(entry=image_entry, binary=image_binary)
 
-    def _tag(self, image_binary: bytes) -> TaggerResult:
-        return self.tagger.tag(image_binary)
+    def _predict(self, image_binary: bytes) -> Any:
+        return self.tagger.predict(image_binary)
+
+    def _stat_files(self, image_files: list[str]) -> dict[str, tuple[int, float]]:
+        """ファイルごとのサイズと更新日時を取得する。取得できなかったファイルは含めない"""
+        file_stats: dict[str, tuple[int, float]] = {}
+        for image_file in image_files:
+            try:
+                file_stats[image_file] = self.storage.stat(image_file)
+            except OSError:
+                continue
+        return file_stats
+
+    def _exclude_cached_registered_files(
+        self, image_files: list[str], file_stats: dict[str, tuple[int, float]]
+    ) -> list[str]:
+        """ハッシュのキャッシュから、変更がなく登録済みと確定できるファイルを除外する
+
+        Args:
+            image_files(list[str]): 画像ファイルのパスのリスト
+            file_stats(dict[str, tuple[int, float]]): ファイルパス -> (サイズ, 更新日時)
+
+        Returns:
+            list[str]: 読み込みが必要な画像ファイルのパスのリスト
+        """
+        with self._db_lock:
+            cached_entries = self.unit_of_work["hash_cache"].find_by_file_locations(list(file_stats))
+            cached_hashes = {
+                entry.file_location.value: entry.hash
+                for entry in cached_entries
+                if entry.matches(*file_stats[entry.file_location.value])
+            }
+            if not cached_hashes:
+                return image_files
+
+            registered_hash_values = self.unit_of_work["images"].find_existing_hash_values(
+                list(set(cached_hashes.values()))
+            )
+            skip_files = {
+                image_file
+                for image_file, image_hash in cached_hashes.items()
+                if image_hash.value in registered_hash_values or image_hash in self._pending_hashes
+            }
+
+        if skip_files:
+            logger.info("skipped %d unchanged registered files by hash cache", len(skip_files))
+        return [image_file for image_file in image_files if image_file not in skip_files]
+
+    def _update_hash_cache(self, image_entries: list[ImageEntry], file_stats: dict[str, tuple[int, float]]) -> None:
+        """読み込んだファイルのハッシュをキャッシュに保存する"""
+        cache_entries = [
+            HashCacheEntry(
+                file_location=entry.file_location,
+                file_size=file_stats[entry.file_location.value][0],
+                mtime=file_stats[entry.file_location.value][1],
+                hash=entry.hash,
+            )
+            for entry in image_entries
+            if entry.file_location.value in file_stats
+        ]
+        with self._db_lock, self.unit_of_work:
+            self.unit_of_work["hash_cache"].upsert(cache_entries)
+
+    def _preprocess(self, image_binary: bytes) -> Any:
+        return self.tagger.preprocess(image_binary)
+
+    def _predict_in_batches(self, inputs: list[Any | Exception], batch_size: int) -> list[Any | Exception]:
+        """前処理済みの入力をbatch_size件ずつまとめて推論する
+
+        前処理に失敗した入力(Exception)はそのまま結果に残す。
+        バッチ単位の推論に失敗した場合は、失敗の影響を1件に限定するため1件ずつ推論し直す。
+
+        Args:
+            inputs(list[Any | Exception]): 前処理済みの入力のリスト
+            batch_size(int): 1回の推論でまとめる件数
+
+        Returns:
+            list[Any | Exception]: 推論結果のリスト。inputsと同じ順番で返す
+        """
+        predictions: list[Any | Exception] = list(inputs)
+        valid_indices = [i for i, x in enumerate(inputs) if not isinstance(x, Exception)]
+
+        for start in range(0, len(valid_indices), batch_size):
+            batch_indices = valid_indices[start : start + batch_size]
+            try:
+                outputs = self.tagger.predict_batch([inputs[i] for i in batch_indices])
+            except TaggingError as e:
+                logger.warning("batch prediction failed, retrying one by one: %s", e)
+                outputs = []
+                for i in batch_indices:
+                    try:
+                        outputs.extend(self.tagger.predict_batch([inputs[i]]))
+                    except TaggingError as single_error:
+                        outputs.append(single_error)
+
+            for i, output in zip(batch_indices, outputs, strict=True):
+                predictions[i] = output
+        return predictions
+
+    def _tag_in_batches(
+        self, image_binaries: list[bytes], n_workers: int | None, batch_size: int, description: str
+    ) -> list[TaggerResult | None]:
+        """画像を前処理しながらbatch_size件ずつまとめて推論し、後処理まで行う
+
+        前処理はスレッドプールで並列実行し、前処理が済んだ順にbatch_size件ずつ推論・後処理する。
+        前処理済みのテンソルはbatch_sizeの2倍までしか先行させず、チャンク全体のテンソルを同時に保持しない。
+
+        Args:
+            image_binaries(list[bytes]): 画像バイナリのリスト
+            n_workers(int | None): 前処理の並列数。Noneの場合は利用可能なCPU数から決める
+            batch_size(int): 1回の推論でまとめる件数
+            description(str): 進捗バーの説明
 
-    @chunk_processor("image_files", default_chunk_size=1000)
-    def _handle(self, image_files: list[str], n_workers: int = 8, chunk_info: ChunkInfo | None = None) -> None:
+        Returns:
+            list[TaggerResult | None]: タグ付け結果のリスト。image_binariesと同じ順番で返し、失敗した画像はNone
+        """
+        inputs = parallel.iter_execute(
+            func=self._preprocess,
+            args_list=[(image_binary,) for image_binary in image_binaries],
+            n_workers=n_workers,
+            strategy=parallel.ExecutionStrategy.THREAD,
+            max_pending=batch_size * 2,
+            show_progress=True,
+            description=description,
+        )
+        tagger_results: list[TaggerResult | None] = []
+        for batch in itertools.batched(inputs, batch_size):
+            predictions = self._predict_in_batches(list(batch), batch_size)
+            # 推論結果(スコアの配列)はすぐに後処理し、次のバッチまで保持しない
+            tagger_results.extend(self._postprocess(prediction) for prediction in predictions)
+        return tagger_results
+
+    def _postprocess(self, prediction: Any | Exception) -> TaggerResult | None:
+        """推論結果を後処理する。推論・後処理に失敗した場合はNoneを返す"""
+        if isinstance(prediction, Exception):
+            return None
+        try:
+            return self.tagger.postprocess(prediction)
+        except TaggingError as e:
+            logger.warning("postprocess failed: %s", e)
+            return None
+
+    @chunk_processor("image_files", default_chunk_size=DEFAULT_CHUNK_SIZE)
+    def _handle(
+        self,
+        image_files: list[str],
+        n_workers: int | None = None,
+        batch_size: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        inference_workers: int = DEFAULT_INFERENCE_WORKERS,
+        chunk_info: ChunkInfo | None = None,
+    ) -> None:
         """画像ディレクトリ内のすべての画像を登録する
 
         chunk_processorによって分割された画像ファイルのリストを処理する
 
         Args:
             image_files(list[str]): 画像ファイルのパスのリスト
-            n_workers(int): タグ付けの並列処理の最大並列数
+            n_workers(int | None): 画像の読み込み・メタデータ抽出・前処理の最大並列数。Noneの場合は利用可能なCPU数から決める
+            batch_size(int): 1回の推論でまとめる画像数。1の場合は画像ごとに推論を並列実行する
+            chunk_size(int): 1チャンクで処理する画像ファイル数(chunk_processorが参照する)
+            inference_workers(int): batch_sizeが1の場合に、画像ごとの推論を同時に実行する数
             chunk_info(ChunkInfo | None): 現在のチャンク処理に関する情報
                 - current_idx: 現在のチャンク番号
-                - total_chunks: 全チャンク数
+                - total_chunks: 全チャンク数(イテレータ入力の場合はNone)
                 - offset: 全体の中の開始インデックス
                 - is_first: 最初のチャンクかどうか
                 - is_last: 最後のチャンクかどうか
@@ -104,7 +290,23 @@ class RegisterNewImageUsecase:
         Raises:
             TaggingError: タグ付けに失敗した場合
         """
-        desc_prefix = f"[{chunk_info.current_idx}/{chunk_info.total_chunks}] " if chunk_info else ""
+        # 書き込みスレッドで失敗していれば、以降のチャンクを処理せずに中断する
+        if self._writer is not None:
+            self._writer.raise_if_failed()
+
+        desc_prefix = ""
+        if chunk_info is not None:
+            total = f"/{chunk_info.total_chunks}" if chunk_info.total_chunks is not None else ""
+            desc_prefix = f"[{chunk_info.current_idx}{total}] "
+
+        # 0. 変更がなく登録済みのファイルをハッシュのキャッシュから判定して除外する
+        file_stats: dict[str, tuple[int, float]] = {}
+        if self.use_hash_cache:
+            file_stats = self._stat_files(image_files)
+            image_files = self._exclude_cached_registered_files(image_files, file_stats)
+            if not image_files:
+                logger.info("no image files to read after hash cache check")
+                return
 
         # 1. バイナリデータを読み込み、メタデータを抽出する
         pairs = parallel.execute(
@@ -124,11 +326,19 @@ class RegisterNewImageUsecase:
             logger.warning("no valid image entries")
             return
 
-        # 3. 既存画像の重複チェック
-        non_duplicate_image_entries = ImageDeduplicationService.filter_duplicates(
-            image_entries=pairs.entries,
-            images_repo=self.unit_of_work["images"],
-        )
+        if self.use_hash_cache:
+            self._update_hash_cache(pairs.entries, file_stats)
+
+        # 3. 既存画像の重複チェック(書き込み待ちの画像も重複として扱う)
+        with self._db_lock:
+            non_duplicate_image_entries = ImageDeduplicationService.filter_duplicates(
+                image_entries=pairs.entries,
+                images_repo=self.unit_of_work["images"],
+                prefix_filter=self._hash_prefix_filter,
+            )
+            non_duplicate_image_entries = [
+                entry for entry in non_duplicate_image_entries if entry.hash not in self._pending_hashes
+            ]
         if not non_duplicate_image_entries:
             logger.info("no image entries after duplicate check")
             return
@@ -137,51 +347,129 @@ class RegisterNewImageUsecase:
         pairs = pairs.filter_by_entry_hashes({entry.hash for entry in non_duplicate_image_entries})
 
         # 5. タグ付け処理
-        tagger_results_raw = parallel.execute(
-            func=self._tag,
-            args_list=[(pair.binary,) for pair in pairs],
-            n_workers=n_workers,
-            strategy=parallel.ExecutionStrategy.THREAD,
-            show_progress=True,
-            description=f"{desc_prefix}Tagging images",
-            raise_on_error=False,
-        )
-
-        # 6. タグ付けできた画像のみを抽出（ExceptionをNoneに変換）
-        tagger_results = [result if not isinstance(result, Exception) else None for result in tagger_results_raw]
-        outcome = TaggingResultClassifier.classify(pairs.entries, tagger_results)
+        # GILを解放する画像デコード・推論のみをスレッドプールで並列実行し、
+        # Pythonの処理が中心の後処理はこのスレッドで直列に実行する(GILの奪い合いを避ける)
+        if batch_size > 1:
+            # 前処理のみを並列実行し、推論はbatch_size件ずつまとめて行う
+            tagger_results = self._tag_in_batches(
+                pairs.binaries, n_workers, batch_size, description=f"{desc_prefix}Tagging images"
+            )
+        else:
+            predictions = parallel.iter_execute(
+                func=self._predict,
+                args_list=[(pair.binary,) for pair in pairs],
+                n_workers=inference_workers,
+                strategy=parallel.ExecutionStrategy.THREAD,
+                # 後処理が追いつかない場合に、推論結果が溜まり続けないよう先行する推論を制限する
+                max_pending=inference_workers * 2,
+                show_progress=True,
+                description=f"{desc_prefix}Tagging images",
+            )
+            # 推論結果(スコアの配列)は取得でき次第このスレッドで後処理し、チャンク全体の推論結果を溜めない
+            tagger_results = [self._postprocess(prediction) for prediction in predictions]
+
+        # 6. タグ付けできた画像のみを抽出（失敗したものはNoneに変換済み）
+        # 推論後はバイナリデータが不要なので、画像エントリのみを残して解放する
+        image_entries = pairs.entries
+        del pairs
+        outcome = TaggingResultClassifier.classify(image_entries, tagger_results)
+        del image_entries, tagger_results
         if not outcome.has_any_success:
             logger.warning("no valid tagged images after filtering")
             return
         logger.info("tagging result: %s", outcome.counts)
 
-        # 7. データベースへの永続化
-        with self.unit_of_work:
-            # images table add
-            image_ids = self.unit_of_work["images"].add([result.image_entry for result in outcome.success])
-
-            # model_tag table add
-            model_tag_entries_list = [
-                ModelTagEntries.from_tagger_result(image_id=image_id, tags=result.tagger_result)
-                for image_id, result in zip(image_ids, outcome.success, strict=True)
-            ]
-            self.unit_of_work["model_tag"].add(model_tag_entries_list)
+        # 7. データベースへの永続化(書き込みスレッドで行い、次のチャンクの処理と重ね合わせる)
+        if self._writer is None:
+            self._persist(outcome.success)
+            return
+        with self._db_lock:
+            self._pending_hashes.update(result.image_entry.hash for result in outcome.success)
+        self._writer.put(outcome.success)
 
-            logger.debug("total registered images: %d", len(image_ids))
-            logger.debug("total registered model_tag_entries: %d", len(model_tag_entries_list))
+    def _persist(self, tagged_entries: list[TaggedImageEntry]) -> None:
+        """タグ付けできた画像とタグをデータベースに永続化する
 
-    def handle(self, image_files: list[str], n_workers: int = 8) -> None:
+        Args:
+            tagged_entries(list[TaggedImageEntry]): タグ付けできた画像のリスト
+        """
+        unit_of_work = self.unit_of_work if self._writer_unit_of_work is None else self._writer_unit_of_work
+        with self._db_lock:
+            try:
+                with unit_of_work:
+                    # images table add
+                    image_ids = unit_of_work["images"].add([result.image_entry for result in tagged_entries])
+
+                    # model_tag table add
+                    model_tag_entries_list = ModelTagEntries.from_tagger_results(
+                        image_ids, [result.tagger_result for result in tagged_entries]
+                    )
+                    unit_of_work["model_tag"].add(model_tag_entries_list)
+
+                    logger.debug("total registered images: %d", len(image_ids))
+                    logger.debug("total registered model_tag_entries: %d", len(model_tag_entries_list))
+
+                # 登録した画像のハッシュをプレフィルタに反映する(コミット成功後のみ)
+                if self._hash_prefix_filter is not None:
+                    self._hash_prefix_filter.add_many(result.image_entry.hash for result in tagged_entries)
+            finally:
+                self._pending_hashes.difference_update(result.image_entry.hash for result in tagged_entries)
+
+    def handle(
+        self,
+        image_files: Iterable[str],
+        n_workers: int | None = None,
+        batch_size: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        inference_workers: int = DEFAULT_INFERENCE_WORKERS,
+    ) -> None:
         """画像ディレクトリ内のすべての画像を登録する
 
         Args:
-            image_files(list[str]): 画像ファイルのパスのリスト
-            n_workers(int): タグ付けの並列処理の最大並列数
+            image_files(Iterable[str]): 画像ファイルのパス
+                イテレータを渡した場合は全体をリストにせず、chunk_size件ずつ読み出して処理する
+            n_workers(int | None): 画像の読み込み・メタデータ抽出・前処理の最大並列数。Noneの場合は利用可能なCPU数から決める
+            batch_size(int): 1回の推論でまとめる画像数
+            chunk_size(int): 1チャンクで処理する画像ファイル数
+            inference_workers(int): batch_sizeが1の場合に、画像ごとの推論を同時に実行する数
         """
-        if not image_files:
-            logger.warning("no input files")
-            return
-        logger.info("total input image files: %d", len(image_files))
-
-        self._handle(image_files, n_workers=n_workers)
+        if isinstance(image_files, Sequence):
+            if not image_files:
+                logger.warning("no input files")
+                return
+            logger.info("total input image files: %d", len(image_files))
+        else:
+            # イテレータは件数が分からないため、先頭の1件を先読みして空かどうかを判定する
+            image_files = iter(image_files)
+            first_file = next(image_files, None)
+            if first_file is None:
+                logger.warning("no input files")
+                return
+            image_files = itertools.chain([first_file], image_files)
+
+        if self.use_hash_prefilter:
+            # ハッシュ値の文字列を全件作らないよう、先頭24bitの値のみをリポジトリから取得する
+            self._hash_prefix_filter = HashPrefixFilter.from_prefixes(
+                self.unit_of_work["images"].list_hash_prefixes(HashPrefixFilter.PREFIX_BITS)
+            )
+
+        # DuckDBの接続は複数スレッドから同時に使えないため、書き込みスレッドには専用の接続を使う
+        self._writer_unit_of_work = self.unit_of_work.for_thread()
+        try:
+            with WriteBehindQueue(consumer=self._persist, maxsize=self.WRITE_BEHIND_QUEUE_SIZE) as writer:
+                self._writer = writer
+                try:
+                    self._handle(
+                        image_files,
+                        n_workers=n_workers,
+                        batch_size=batch_size,
+                        chunk_size=chunk_size,
+                        inference_workers=inference_workers,
+                    )
+                finally:
+                    self._writer = None
+        finally:
+            self._writer_unit_of_work.close()
+            self._writer_unit_of_work = None
 
         logger.info("completed")
@@ -1,6 +1,11 @@
-from collections.abc import Callable
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import os
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import BrokenExecutor, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from enum import Enum
+from itertools import islice, repeat
 from logging import getLogger
 from typing import Any, TypeVar
 
@@ -18,35 +23,38 @@ class ExecutionStrategy(str, Enum):
     PROCESS = "process"
 
 
-def execute[T](
-    func: Callable[..., T],
-    args_list: list[tuple[Any, ...]] | None = None,
-    kwargs_list: list[dict[str, Any]] | None = None,
-    *,
-    n_workers: int,
-    strategy: ExecutionStrategy = ExecutionStrategy.THREAD,
-    show_progress: bool = True,
-    description: str = "Processing",
-    raise_on_error: bool = False,
-) -> list[T | Exception]:
-    """関数の引数リストを並列実行
+def default_n_workers() -> int:
+    """このプロセスが利用できるCPU数から既定の並列数を決める
 
-    Args:
-        func: 実行する関数
-        args_list: 各タスクに渡す位置引数のリスト。省略可能
-        kwargs_list: 各タスクに渡すキーワード引数のリスト。省略可能
-        n_workers: 並列実行の最大並列数
-        strategy: 並列実行ストラテジー
-        show_progress: 進捗バーを表示するかどうか
-        description: 進捗バーの説明
-        raise_on_error: エラーが発生した場合に例外を発生させるかどうか
+    I/OとGILを解放するC拡張の処理が混在する前提で、利用可能なCPU数の2倍(最大32)とする。
+    NOTE: 1回の呼び出しで複数コアを使う処理(ONNX Runtimeの推論など)には過剰なため、呼び出し元で小さい並列数を指定すること。
 
     Returns:
-        list[T | Exception]: 実行結果のリスト
-        入力された引数リストの順番に実行結果が返ってくる
+        int: 並列数
+    """
+    try:
+        n_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # sched_getaffinityがないプラットフォーム(Windows, macOS)
+        n_cpus = os.cpu_count() or 1
+    return min(32, n_cpus * 2)
 
-    Note:
-        args_list と kwargs_list の少なくとも一方は指定する必要がある
+
+def _call_safely[T](func: Callable[..., T], args: tuple[Any, ...], kwargs: dict[str, Any]) -> T | Exception:
+    """関数を実行し、発生した例外は送出せずに戻り値として返す"""
+    try:
+        return func(*args, **kwargs)
+    # タスクの失敗は種類によらずそのタスクの結果として返し、他のタスクの結果を失わないようにする
+    except Exception as e:  # noqa: BLE001
+        return e
+
+
+def _normalize_arguments(
+    args_list: list[tuple[Any, ...]] | None, kwargs_list: list[dict[str, Any]] | None
+) -> tuple[list[tuple[Any, ...]], list[dict[str, Any]], int]:
+    """args_listとkwargs_listを検証し、同じ長さにそろえる
+
+    Returns:
+        tuple[list[tuple[Any, ...]], list[dict[str, Any]], int]: 位置引数のリスト、キーワード引数のリスト、タスク数
     """
     # バリデーション
     if args_list is None and kwargs_list is None:
@@ -71,28 +79,153 @@ def execute[T](
     else:  # kwargs_list only
         num_tasks = len(kwargs_list)
         args_list = [()] * num_tasks
+    return args_list, kwargs_list, num_tasks
 
-    executor_class = ThreadPoolExecutor if strategy == ExecutionStrategy.THREAD else ProcessPoolExecutor
 
-    results: list[T | Exception] = [None] * num_tasks  # type: ignore[list-item]
+def _iter_bounded[T](
+    ex: Executor,
+    func: Callable[..., T],
+    args_list: list[tuple[Any, ...]],
+    kwargs_list: list[dict[str, Any]],
+    max_pending: int,
+) -> Iterator[T | Exception]:
+    """実行中・結果の取得待ちのタスクを最大max_pending件に抑えながら、入力の順番で結果を返す"""
+    tasks = zip(args_list, kwargs_list, strict=True)
+    pending: deque[Future[T | Exception]] = deque(
+        ex.submit(_call_safely, func, args, kwargs) for args, kwargs in islice(tasks, max_pending)
+    )
+    while pending:
+        result = pending.popleft().result()
+        # 結果を1件取り出すごとに次のタスクを1件投入する
+        for args, kwargs in islice(tasks, 1):
+            pending.append(ex.submit(_call_safely, func, args, kwargs))
+        yield result
+
+
+def iter_execute[T](
+    func: Callable[..., T],
+    args_list: list[tuple[Any, ...]] | None = None,
+    kwargs_list: list[dict[str, Any]] | None = None,
+    *,
+    n_workers: int | None = None,
+    strategy: ExecutionStrategy = ExecutionStrategy.THREAD,
+    chunk_size: int = 1,
+    executor: Executor | None = None,
+    max_pending: int | None = None,
+    show_progress: bool = True,
+    description: str = "Processing",
+) -> Iterator[T | Exception]:
+    """関数の引数リストを並列実行し、結果を入力の順番で取得でき次第返す
 
-    with executor_class(max_workers=n_workers) as ex:
-        futures = {
-            ex.submit(func, *args, **kwargs): idx
-            for idx, (args, kwargs) in enumerate(zip(args_list, kwargs_list, strict=True))
-        }
+    結果をすべて溜めずに1件ずつ処理できる。タスクで発生した例外は送出せずに結果として返す。
 
-        iterator = as_completed(futures)
-        if show_progress:
-            iterator = tqdm(iterator, total=num_tasks, desc=description, leave=False)
+    Args:
+        func: 実行する関数
+        args_list: 各タスクに渡す位置引数のリスト。省略可能
+        kwargs_list: 各タスクに渡すキーワード引数のリスト。省略可能
+        n_workers: 並列実行の最大並列数。Noneの場合はdefault_n_workers()の値を使う
+        strategy: 並列実行ストラテジー
+        chunk_size: PROCESSの場合に1回のプロセス間通信でまとめてワーカーに渡すタスク数。THREADの場合は無視される
+        executor: 使用する作成済みのExecutor。指定した場合はn_workers, strategyを無視し、シャットダウンしない
+        max_pending: 実行中・結果の取得待ちにできるタスク数の上限。
+            Noneの場合はすべてのタスクを最初に投入する。結果が大きい場合に、呼び出し元の処理より先に進みすぎないよう制限する
+            (指定した場合はchunk_sizeを無視する)
+        show_progress: 進捗バーを表示するかどうか
+        description: 進捗バーの説明
 
-        for future in iterator:
-            idx = futures[future]
-            try:
-                results[idx] = future.result()
-            except Exception as e:
-                if raise_on_error:
-                    raise
-                results[idx] = e
+    Yields:
+        T | Exception: 実行結果。入力された引数リストの順番に返す
+        ワーカープロセスの異常終了などでExecutorが使えなくなった場合は、結果を取得できなかったタスクの結果がその例外になる
+    """
+    args_list, kwargs_list, num_tasks = _normalize_arguments(args_list, kwargs_list)
+    if n_workers is None:
+        n_workers = default_n_workers()
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer. Got {chunk_size}")
+    if max_pending is not None and max_pending < 1:
+        raise ValueError(f"max_pending must be a positive integer. Got {max_pending}")
+
+    if executor is None:
+        executor_class = ThreadPoolExecutor if strategy == ExecutionStrategy.THREAD else ProcessPoolExecutor
+        executor_context = executor_class(max_workers=n_workers)
+    else:
+        # 呼び出し元が管理するExecutorはここでシャットダウンしない
+        executor_context = nullcontext(executor)
+
+    with executor_context as ex:
+        n_completed = 0
+        try:
+            # mapは入力の順番で結果を返すため、Futureと入力位置の対応を管理しなくてよい
+            if max_pending is None:
+                iterator = ex.map(_call_safely, repeat(func), args_list, kwargs_list, chunksize=chunk_size)
+            else:
+                iterator = _iter_bounded(ex, func, args_list, kwargs_list, max_pending)
+            if show_progress:
+                iterator = tqdm(iterator, total=num_tasks, desc=description, leave=False)
+
+            for result in iterator:
+                n_completed += 1
+                yield result
+        except BrokenExecutor as e:
+            # Executorが壊れると残りのタスクの結果は取得できないため、それぞれのタスクの失敗として返す
+            logger.error("executor is broken after %d/%d tasks: %s", n_completed, num_tasks, e)
+            for _ in range(num_tasks - n_completed):
+                yield e
 
+
+def execute[T](
+    func: Callable[..., T],
+    args_list: list[tuple[Any, ...]] | None = None,
+    kwargs_list: list[dict[str, Any]] | None = None,
+    *,
+    n_workers: int | None = None,
+    strategy: ExecutionStrategy = ExecutionStrategy.THREAD,
+    chunk_size: int = 1,
+    executor: Executor | None = None,
+    show_progress: bool = True,
+    description: str = "Processing",
+    raise_on_error: bool = False,
+) -> list[T | Exception]:
+    """関数の引数リストを並列実行
+
+    Args:
+        func: 実行する関数
+        args_list: 各タスクに渡す位置引数のリスト。省略可能
+        kwargs_list: 各タスクに渡すキーワード引数のリスト。省略可能
+        n_workers: 並列実行の最大並列数。Noneの場合はdefault_n_workers()の値を使う
+        strategy: 並列実行ストラテジー
+        chunk_size: PROCESSの場合に1回のプロセス間通信でまとめてワーカーに渡すタスク数。
+            タスクあたりの処理が短いほど大きくすると通信のオーバーヘッドを減らせる。THREADの場合は無視される
+        executor: 使用する作成済みのExecutor。指定した場合はn_workers, strategyを無視し、
+            呼び出し後もシャットダウンしない。繰り返し呼び出す場合にワーカーの起動コストを省ける
+        show_progress: 進捗バーを表示するかどうか
+        description: 進捗バーの説明
+        raise_on_error: エラーが発生した場合に例外を発生させるかどうか
+
+    Returns:
+        list[T | Exception]: 実行結果のリスト
+        入力された引数リストの順番に実行結果が返ってくる
+        ワーカープロセスの異常終了などでExecutorが使えなくなった場合は、結果を取得できなかったタスクの結果がその例外になる
+
+    Note:
+        args_list と kwargs_list の少なくとも一方は指定する必要がある
+    """
+    # 引数の検証はジェネレーターの開始を待たずにこの呼び出しで行う
+    args_list, kwargs_list, _ = _normalize_arguments(args_list, kwargs_list)
+
+    results: list[T | Exception] = []
+    for result in iter_execute(
+        func,
+        args_list,
+        kwargs_list,
+        n_workers=n_workers,
+        strategy=strategy,
+        chunk_size=chunk_size,
+        executor=executor,
+        show_progress=show_progress,
+        description=description,
+    ):
+        if raise_on_error and isinstance(result, Exception):
+            raise result
+        results.append(result)
     return results
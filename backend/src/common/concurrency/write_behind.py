@@ -0,0 +1,108 @@
+"""書き込みを別スレッドで非同期に行うキュー"""
+
+import queue
+import threading
+
+from collections.abc import Callable
+from logging import getLogger
+
+
+logger = getLogger(__name__)
+
+_SENTINEL = object()
+
+
+class WriteBehindQueue[T]:
+    """投入されたアイテムを専用の書き込みスレッドで順番に処理するキュー
+
+    呼び出し元は書き込みの完了を待たずに次の処理へ進めるため、書き込みI/Oと他の処理を重ね合わせられる。
+    キューの長さはmaxsizeで制限され、書き込みが追いつかない場合はputがブロックする。
+
+    書き込みで例外が発生した場合は以降のアイテムを処理せず、次のput/close時(またはraise_if_failed)に呼び出し元へ再送出する。
+
+    Example:
+        >>> with WriteBehindQueue(consumer=repository.add, maxsize=4) as writer:
+        ...     for batch in batches:
+        ...         writer.put(batch)
+    """
+
+    def __init__(self, consumer: Callable[[T], None], maxsize: int = 4) -> None:
+        """WriteBehindQueueを初期化し、書き込みスレッドを開始する
+
+        Args:
+            consumer(Callable[[T], None]): 各アイテムを書き込む関数
+            maxsize(int): キューに溜められるアイテムの最大数
+        """
+        self._consumer = consumer
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._error: Exception | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _SENTINEL:
+                    return
+                if self._error is None:
+                    self._consumer(item)
+            except Exception as e:
+                logger.exception("write-behind consumer failed")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def raise_if_failed(self) -> None:
+        """それまでの書き込みで例外が発生していれば送出する
+
+        Raises:
+            Exception: 書き込みで発生した例外
+        """
+        if self._error is not None:
+            raise self._error
+
+    def join(self) -> None:
+        """投入済みのアイテムがすべて処理されるまで待つ"""
+        self._queue.join()
+
+    def put(self, item: T) -> None:
+        """アイテムを書き込みキューに投入する
+
+        Args:
+            item(T): 書き込むアイテム
+
+        Raises:
+            RuntimeError: close済みの場合
+            Exception: それまでの書き込みで発生した例外
+        """
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is already closed")
+        self.raise_if_failed()
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """キューに残っているアイテムをすべて書き込んでから書き込みスレッドを終了する
+
+        Raises:
+            Exception: 書き込みで発生した例外
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_SENTINEL)
+            self._thread.join()
+        self.raise_if_failed()
+
+    def __enter__(self) -> "WriteBehindQueue[T]":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # 呼び出し元で例外が発生した場合は、その例外を優先して送出する
+        try:
+            self.close()
+        except Exception:
+            logger.exception("write-behind consumer failed while handling another exception")
@@ -1,7 +1,8 @@
 import functools
 import inspect
+import itertools
 
-from collections.abc import Callable
+from collections.abc import Callable, Sized
 from dataclasses import dataclass
 from typing import Any, TypeVar
 
@@ -14,56 +15,101 @@ class ChunkInfo:
     """現在のチャンク処理に関する情報"""
 
     current_idx: int  # 1から始まる現在のチャンク番号
-    total_chunks: int  # 全チャンク数
+    total_chunks: int | None  # 全チャンク数(イテレータが入力された場合は不明のためNone)
     offset: int  # 全体の中の開始インデックス
     is_first: bool  # 最初のチャンクかどうか
     is_last: bool  # 最後のチャンクかどうか
 
 
 def chunk_processor(list_arg_name: str, default_chunk_size: int = 1000):
+    """リスト引数をチャンクに分割して関数を繰り返し実行するデコレータ
+
+    リストの代わりにイテレータなどの長さを持たないIterableを渡した場合は、
+    全体を読み込まずにchunk_size件ずつ取り出して実行する。
+
+    Args:
+        list_arg_name(str): 分割する引数の名前
+        default_chunk_size(int): 引数にchunk_sizeがない場合のチャンクサイズ
+    """
+
     def decorator(func: Callable[..., Any]):
         sig = inspect.signature(func)
         has_chunk_info = "chunk_info" in sig.parameters
 
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            bound_args = sig.bind(*args, **kwargs)
-            bound_args.apply_defaults()
+        def _run_chunk(bound_args: inspect.BoundArguments, chunk: list, chunk_info: ChunkInfo) -> Any:
+            # リスト引数をチャンクに差し替え
+            bound_args.arguments[list_arg_name] = chunk
 
-            all_items = bound_args.arguments.get(list_arg_name)
-            # 引数に chunk_size があれば優先、なければデフォルト
-            chunk_size = bound_args.arguments.get("chunk_size", default_chunk_size)
+            # chunk_infoを欲しがっている場合に注入
+            if has_chunk_info:
+                bound_args.arguments["chunk_info"] = chunk_info
 
-            # chunk_sizeがNone/0、またはリストがサイズ以下の場合は分割せずに実行
-            if not chunk_size or not all_items or len(all_items) <= chunk_size:
-                return func(*args, **kwargs)
+            return func(*bound_args.args, **bound_args.kwargs)
 
+        def _process_sized(bound_args: inspect.BoundArguments, all_items: Any, chunk_size: int) -> list:
             total = len(all_items)
             total_chunks = (total + chunk_size - 1) // chunk_size
             results = []
 
             for i in range(0, total, chunk_size):
                 current_idx = (i // chunk_size) + 1
-                chunk = all_items[i : i + chunk_size]
+                chunk_info = ChunkInfo(
+                    current_idx=current_idx,
+                    total_chunks=total_chunks,
+                    offset=i,
+                    is_first=(current_idx == 1),
+                    is_last=(current_idx == total_chunks),
+                )
+                results.append(_run_chunk(bound_args, all_items[i : i + chunk_size], chunk_info))
 
-                # リスト引数をチャンクに差し替え
-                bound_args.arguments[list_arg_name] = chunk
+            return results
 
-                # chunk_infoを欲しがっている場合に注入
-                if has_chunk_info:
-                    bound_args.arguments["chunk_info"] = ChunkInfo(
-                        current_idx=current_idx,
-                        total_chunks=total_chunks,
-                        offset=i,
-                        is_first=(current_idx == 1),
-                        is_last=(current_idx == total_chunks),
-                    )
+        def _process_iterable(bound_args: inspect.BoundArguments, all_items: Any, chunk_size: int) -> list:
+            # 最後のチャンクかどうかを判定するため、1チャンク先読みする
+            batches = itertools.batched(all_items, chunk_size)
+            current = next(batches, None)
+            current_idx = 0
+            offset = 0
+            results = []
 
-                res = func(*bound_args.args, **bound_args.kwargs)
-                results.append(res)
+            while current is not None:
+                following = next(batches, None)
+                current_idx += 1
+                chunk_info = ChunkInfo(
+                    current_idx=current_idx,
+                    total_chunks=None,
+                    offset=offset,
+                    is_first=(current_idx == 1),
+                    is_last=(following is None),
+                )
+                results.append(_run_chunk(bound_args, list(current), chunk_info))
+                offset += len(current)
+                current = following
 
             return results
 
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound_args = sig.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+
+            all_items = bound_args.arguments.get(list_arg_name)
+            # 引数に chunk_size があれば優先、なければデフォルト
+            chunk_size = bound_args.arguments.get("chunk_size", default_chunk_size)
+
+            if not isinstance(all_items, Sized):
+                if chunk_size:
+                    return _process_iterable(bound_args, all_items, chunk_size)
+                # chunk_sizeがNone/0の場合はすべて読み込んでから分割せずに実行
+                bound_args.arguments[list_arg_name] = list(all_items)
+                return func(*bound_args.args, **bound_args.kwargs)
+
+            # chunk_sizeがNone/0、またはリストがサイズ以下の場合は分割せずに実行
+            if not chunk_size or not all_items or len(all_items) <= chunk_size:
+                return func(*args, **kwargs)
+
+            return _process_sized(bound_args, all_items, chunk_size)
+
         return wrapper
 
     return decorator
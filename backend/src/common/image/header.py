@@ -0,0 +1,96 @@
+"""画像ファイルのヘッダから画像サイズを取得する
+
+PIL.Image.openを使わずに、主要な形式(PNG/JPEG/GIF/WebP)のヘッダを直接解析する。
+"""
+
+import struct
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+
+# 画像サイズを持つJPEGのSOFマーカー(DHT/JPG/DACを除くSOF0-SOF15)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# 長さフィールドを持たないJPEGのマーカー(TEM, RST0-RST7, SOI, EOI)
+_JPEG_STANDALONE_MARKERS = frozenset([0x01, *range(0xD0, 0xDA)])
+
+
+def _parse_png(buf: bytes) -> tuple[int, int] | None:
+    if len(buf) < 24 or buf[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack_from(">II", buf, 16)
+    return width, height
+
+
+def _parse_gif(buf: bytes) -> tuple[int, int] | None:
+    if len(buf) < 10:
+        return None
+    width, height = struct.unpack_from("<HH", buf, 6)
+    return width, height
+
+
+def _parse_jpeg(buf: bytes) -> tuple[int, int] | None:
+    i, n = 2, len(buf)
+    while i + 1 < n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        # マーカー前の埋め草(0xFF)は読み飛ばす
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            i += 2
+            continue
+        if i + 4 > n:
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack_from(">HH", buf, i + 5)
+            return width, height
+        (length,) = struct.unpack_from(">H", buf, i + 2)
+        i += 2 + length
+    return None
+
+
+def _parse_webp(buf: bytes) -> tuple[int, int] | None:
+    if len(buf) < 30:
+        return None
+    chunk = buf[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack_from("<HH", buf, 26)
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        (bits,) = struct.unpack_from("<I", buf, 21)
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        width = int.from_bytes(buf[24:27], "little") + 1
+        height = int.from_bytes(buf[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def parse_image_size(buf: bytes) -> tuple[int, int] | None:
+    """画像バイナリのヘッダから画像サイズを取得する
+
+    Args:
+        buf(bytes): 画像バイナリ(先頭部分のみでもよい)
+
+    Returns:
+        tuple[int, int] | None: (幅, 高さ)。未対応の形式、またはヘッダが不正な場合はNone
+    """
+    if buf.startswith(_PNG_SIGNATURE):
+        size = _parse_png(buf)
+    elif buf.startswith(b"\xff\xd8"):
+        size = _parse_jpeg(buf)
+    elif buf.startswith(_GIF_SIGNATURES):
+        size = _parse_gif(buf)
+    elif buf.startswith(b"RIFF") and buf[8:12] == b"WEBP":
+        size = _parse_webp(buf)
+    else:
+        size = None
+
+    if size is None or size[0] <= 0 or size[1] <= 0:
+        return None
+    return size
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+
+from domain.value_objects.file_location import FileLocation
+from domain.value_objects.image_hash import ImageHash
+
+
+@dataclass(frozen=True, slots=True)
+class HashCacheEntry:
+    """ファイルの状態(サイズ・更新日時)と画像ハッシュの対応を表すエントリーオブジェクト
+
+    ファイルサイズと更新日時が一致する場合、ファイルを読み込まずにハッシュを再利用できる。
+    """
+
+    file_location: FileLocation
+    file_size: int
+    mtime: float
+    hash: ImageHash
+
+    def matches(self, file_size: int, mtime: float) -> bool:
+        """ファイルの状態がキャッシュ時から変わっていないかどうか"""
+        return self.file_size == file_size and self.mtime == mtime
@@ -1,4 +1,4 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import datetime
 
 from domain.value_objects.file_location import FileLocation
@@ -6,7 +6,7 @@ from domain.value_objects.image_hash import ImageHash
 from domain.value_objects.image_size import ImageSize
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImageMetadata:
     """画像ファイルのメタデータ"""
 
@@ -17,7 +17,7 @@ class ImageMetadata:
     file_size: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImageEntry:
     """imagesDBへのエントリーオブジェクト"""
 
@@ -46,10 +46,18 @@ class ImageEntry:
 
     def to_dict(self) -> dict[str, object]:
         """ImageEntryの辞書"""
-        result = asdict(self)
-        result["hash"] = str(self.hash)
-        result["file_location"] = str(self.file_location)
-        return result
+        # asdictは値オブジェクトも再帰的にコピーするため、辞書を直接組み立てる
+        return {
+            "image_id": self.image_id,
+            "file_location": self.file_location.value,
+            "width": self.width,
+            "height": self.height,
+            "file_type": self.file_type,
+            "hash": self.hash.value,
+            "file_size": self.file_size,
+            "added_at": self.added_at,
+            "updated_at": self.updated_at,
+        }
 
 
 class ImageMetadataFactory:
@@ -1,9 +1,9 @@
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 
 from domain.tagger.result import TaggerResult
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ModelTagEntry:
     """タグ1つ"""
 
@@ -14,7 +14,7 @@ class ModelTagEntry:
     archived: bool = False
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ModelTagEntries:
     """1画像に対する複数タグを持つ"""
 
@@ -22,24 +22,41 @@ class ModelTagEntries:
 
     @classmethod
     def from_tagger_result(cls, image_id: int, tags: TaggerResult) -> "ModelTagEntries":
-        """TaggerResultからModelTagEntriesを作成"""
+        """TaggerResultからModelTagEntriesを作成
+
+        TaggerResult.iter_rowsは(str, str, float)を返すため、値の型変換は行わない。
+        """
         return cls(
-            entries=[
-                ModelTagEntry(
-                    image_id,
-                    str(r["category"]),
-                    str(r["tag"]),
-                    float(r["score"]),
-                    archived=False,
-                )
-                for r in tags.to_dict_list()
-            ],
+            entries=[ModelTagEntry(image_id, category, tag, score, False) for category, tag, score in tags.iter_rows()],
         )
 
+    @classmethod
+    def from_tagger_results(cls, image_ids: list[int], results: list[TaggerResult]) -> list["ModelTagEntries"]:
+        """複数画像のTaggerResultからModelTagEntriesのリストをまとめて作成
+
+        Args:
+            image_ids(list[int]): 画像IDのリスト
+            results(list[TaggerResult]): image_idsと同じ順番のTaggerResultのリスト
+
+        Returns:
+            list[ModelTagEntries]: 画像ごとのModelTagEntries
+        """
+        from_tagger_result = cls.from_tagger_result
+        return [from_tagger_result(image_id, result) for image_id, result in zip(image_ids, results, strict=True)]
+
     def show(self) -> None:
         for entry in self.entries:
             print(entry)
 
     def to_dict_list(self) -> list[dict[str, object]]:
         """ModelTagEntriesの辞書リスト形式"""
-        return [asdict(entry) for entry in self.entries]
+        return [
+            {
+                "image_id": entry.image_id,
+                "category": entry.category,
+                "tag": entry.tag,
+                "score": entry.score,
+                "archived": entry.archived,
+            }
+            for entry in self.entries
+        ]
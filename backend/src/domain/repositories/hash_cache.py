@@ -0,0 +1,26 @@
+from typing import Protocol
+
+from domain.entities.hash_cache import HashCacheEntry
+
+
+class HashCacheRepository(Protocol):
+    """ファイルごとの画像ハッシュのキャッシュのリポジトリ"""
+
+    def find_by_file_locations(self, file_locations: list[str]) -> list[HashCacheEntry]:
+        """ファイルパスでキャッシュを取得
+
+        Args:
+            file_locations(list[str]): ファイルパスのリスト
+
+        Returns:
+            list[HashCacheEntry]: キャッシュが存在したファイルのエントリー
+        """
+        ...
+
+    def upsert(self, entries: list[HashCacheEntry]) -> None:
+        """キャッシュをまとめて追加・更新
+
+        Args:
+            entries(list[HashCacheEntry]): エントリーのリスト
+        """
+        ...
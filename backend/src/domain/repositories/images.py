@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from typing import Protocol
 
 from domain.entities.images import ImageEntry
@@ -70,6 +71,40 @@ class ImagesRepository(Protocol):
         """
         ...
 
+    def find_existing_hash_values(self, hash_values: list[ImageHash]) -> set[str]:
+        """指定したハッシュのうち登録済みのものを取得
+
+        画像のレコード全体は読み込まず、ハッシュのみを返す。
+
+        Args:
+            hash_values(list[ImageHash]): ハッシュのリスト
+
+        Returns:
+            set[str]: 登録済みのハッシュ値(16進文字列)の集合
+        """
+        ...
+
+    def list_hash_values(self) -> list[str]:
+        """登録済みのすべての画像のハッシュ値を取得
+
+        Returns:
+            list[str]: ハッシュ値(16進文字列)のリスト
+        """
+        ...
+
+    def list_hash_prefixes(self, prefix_bits: int) -> Sequence[int]:
+        """登録済みのすべての画像のハッシュの先頭prefix_bitsビットの値を重複なしで取得
+
+        ハッシュ値の文字列は作らず、整数の配列として返す。
+
+        Args:
+            prefix_bits(int): 取得する先頭のビット数(4の倍数)
+
+        Returns:
+            Sequence[int]: ハッシュの先頭ビットの値の配列
+        """
+        ...
+
     def update(self, entities: list[ImageEntry]) -> None:
         """複数の画像をまとめてUPDATE
 
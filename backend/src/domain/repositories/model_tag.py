@@ -44,3 +44,14 @@ class ModelTagRepository(Protocol):
             int: 削除した件数
         """
         ...
+
+    def remove_all_by_image_ids(self, image_ids: list[int]) -> int:
+        """画像IDのリストで複数の画像に対するすべてのタグをまとめて削除
+
+        Args:
+            image_ids(list[int]): 画像IDのリスト
+
+        Returns:
+            int: 削除した件数
+        """
+        ...
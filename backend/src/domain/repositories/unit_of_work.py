@@ -23,6 +23,21 @@ class UnitOfWorkProtocol(Protocol):
         """指定されたキーのサブセットをUnit of Workとして取得"""
         ...
 
+    def for_thread(self) -> "UnitOfWorkProtocol":
+        """別スレッドで使うUnit of Workを作成
+
+        使い終わったらcloseを呼び出すこと
+        """
+        ...
+
+    def close(self) -> None:
+        """for_threadで作成したUnit of Workのリソースを解放"""
+        ...
+
+    def _begin(self) -> None:
+        """トランザクションを開始"""
+        ...
+
     def _commit(self) -> None:
         """トランザクションをコミット"""
         ...
@@ -32,7 +47,10 @@ class UnitOfWorkProtocol(Protocol):
         ...
 
     def __enter__(self) -> "UnitOfWorkProtocol":
-        """コンテキストマネージャーの開始"""
+        """コンテキストマネージャーの開始
+
+        トランザクションを開始する
+        """
         ...
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -1,5 +1,6 @@
 """Taggerのタグカテゴリとタグスコアを表現する型定義モジュール"""
 
+from collections.abc import Iterator
 from dataclasses import InitVar, dataclass, field
 
 
@@ -79,6 +80,18 @@ class TaggerResult:
             for tag, score in items:
                 print(f"{tag}: {score:.3f}")
 
+    def iter_rows(self) -> Iterator[tuple[str, str, float]]:
+        """タグ情報を(category, tag, score)のタプルとして順に返す
+
+        to_dict_listと同じ順番・内容を、タグごとの辞書を作らずに返す。
+
+        Yields:
+            tuple[str, str, float]: (カテゴリ, タグ名, スコア)
+        """
+        for category, items in self._original_tags.items():
+            for tag, score in items:
+                yield category, tag, score
+
     def to_dict_list(self) -> list[dict[str, str | float]]:
         """タグ情報を辞書のリスト形式で取得する
 
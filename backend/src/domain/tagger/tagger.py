@@ -1,4 +1,4 @@
-from typing import Protocol
+from typing import Any, Protocol
 
 from domain.tagger.result import TaggerResult
 
@@ -8,9 +8,75 @@ class Tagger(Protocol):
 
     def initialize(self) -> None: ...
 
+    def preprocess(self, image_binary: bytes) -> Any:
+        """画像バイナリをデコードし、モデルに入力できる形式に変換する
+
+        C拡張(画像デコード)の処理が中心でGILを解放するため、スレッドプールで並列実行する想定
+
+        Args:
+            image_binary(bytes): 画像バイナリ
+
+        Returns:
+            Any: モデル入力(バッチ次元を含まない1画像分)。predict_batchにそのまま渡す
+
+        Raises:
+            TaggingError: 前処理に失敗した場合
+        """
+        ...
+
+    def predict_batch(self, inputs: list[Any]) -> list[Any]:
+        """前処理済みの複数画像をまとめて推論する
+
+        Args:
+            inputs(list[Any]): preprocessの戻り値のリスト
+
+        Returns:
+            list[Any]: 推論結果の生データのリスト。inputsと同じ順番で返す
+
+        Raises:
+            RuntimeError: モデルセッションが初期化されていない場合
+            TaggingError: タグ推論に失敗した場合
+        """
+        ...
+
+    def predict(self, image_binary: bytes) -> Any:
+        """画像バイナリのデコード・前処理・推論までを行う
+
+        C拡張(画像デコード・推論ランタイム)の処理が中心でGILを解放するため、スレッドプールで並列実行する想定
+
+        Args:
+            image_binary(bytes): 画像バイナリ
+
+        Returns:
+            Any: 推論結果の生データ。postprocessにそのまま渡す
+
+        Raises:
+            RuntimeError: モデルセッションが初期化されていない場合
+            TaggingError: タグ推論に失敗した場合
+        """
+        ...
+
+    def postprocess(self, prediction: Any) -> TaggerResult:
+        """推論結果の生データをタグ推論結果に変換する
+
+        Pythonの処理が中心のため、スレッドプールではなく呼び出し元のスレッドで直列に実行する想定
+
+        Args:
+            prediction(Any): predictの戻り値
+
+        Returns:
+            TaggerResult: タグ推論結果
+
+        Raises:
+            TaggingError: 後処理に失敗した場合
+        """
+        ...
+
     def tag(self, image_binary: bytes) -> TaggerResult:
         """画像バイナリに対してタグ推論 + カテゴリ分類まで行う
 
+        predictとpostprocessを続けて実行する
+
         Args:
             image_binary(bytes): 画像バイナリ
 
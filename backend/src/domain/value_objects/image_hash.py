@@ -9,7 +9,7 @@ import hashlib
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ImageHash:
     """画像ハッシュの値オブジェクト（SHA256）"""
 
@@ -20,11 +20,29 @@ class ImageHash:
             raise ValueError("Hash cannot be empty")
         if len(self.value) != 64:  # SHA256のhexdigest長
             raise ValueError(f"Invalid hash format: expected 64 characters, got {len(self.value)}")
-        # 16進数の文字列かチェック
+        # 16進数の文字列かチェック(空白を含む場合は32バイトにならない)
         try:
-            int(self.value, 16)
-        except ValueError as e:
-            raise ValueError(f"Invalid hash format: not a valid hexadecimal string: {self.value[:20]}...") from e
+            is_hex = len(bytes.fromhex(self.value)) == 32
+        except ValueError:
+            is_hex = False
+        if not is_hex:
+            raise ValueError(f"Invalid hash format: not a valid hexadecimal string: {self.value[:20]}...")
+
+    @classmethod
+    def _trusted(cls, value: str) -> "ImageHash":
+        """検証を行わずにImageHashを作成する
+
+        hexdigestの結果など、正しい形式であることが保証されている値にのみ使う。
+
+        Args:
+            value(str): SHA256の16進文字列
+
+        Returns:
+            ImageHash: ハッシュ値オブジェクト
+        """
+        image_hash = object.__new__(cls)
+        object.__setattr__(image_hash, "value", value)
+        return image_hash
 
     @classmethod
     def from_binary(cls, binary_data: bytes) -> "ImageHash":
@@ -37,7 +55,11 @@ class ImageHash:
             ImageHash: 計算されたハッシュ値オブジェクト
         """
         hash_str = hashlib.sha256(binary_data).hexdigest()
-        return cls(hash_str)
+        return cls._trusted(hash_str)
+
+    def __hash__(self) -> int:
+        # dataclassの既定の実装はフィールドのタプルを作ってハッシュするため、文字列のハッシュを直接返す
+        return hash(self.value)
 
     def __str__(self) -> str:
         return self.value
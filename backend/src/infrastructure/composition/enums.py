@@ -1,9 +1,8 @@
-from enum import Enum
+from enum import StrEnum
 
 
-class BaseEnum(str, Enum):
-    def __str__(self) -> str:
-        return self.value
+class BaseEnum(StrEnum):
+    pass
 
 
 class StorageType(BaseEnum):
@@ -13,6 +12,7 @@ class StorageType(BaseEnum):
 class RepositoryType(BaseEnum):
     IMAGES = "images"
     MODEL_TAG = "model_tag"
+    HASH_CACHE = "hash_cache"
 
 
 class DataBaseType(BaseEnum):
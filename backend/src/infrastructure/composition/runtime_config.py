@@ -45,6 +45,10 @@ class RuntimeConfig:
                 database=database,
                 table_name=tagger.tag_table_name,
             ),
+            hash_cache=RepositoryConfigRegistry(
+                RepositoryType.HASH_CACHE.value,
+                database=database,
+            ),
         )
 
         return RuntimeConfig(
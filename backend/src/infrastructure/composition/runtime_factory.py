@@ -1,7 +1,5 @@
-import importlib
-
-from types import ModuleType
-from typing import TYPE_CHECKING, TypeGuard
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
 from application.storage.client import Storage
 from infrastructure.registry.adapter import (
@@ -13,7 +11,20 @@ from infrastructure.registry.adapter import (
 
 if TYPE_CHECKING:
     from infrastructure.composition.runtime_config import RuntimeConfig
-    from infrastructure.configs.database import DataBaseConfig, DuckDBConfig
+    from infrastructure.configs.database import DuckDBConfig
+
+
+def _connect_duckdb(config: "DuckDBConfig") -> Any:
+    import duckdb
+
+    return duckdb.connect(config.database_file)
+
+
+# データベースのadapter_key -> 接続を開く関数
+# NOTE: 現状はDuckDBのみ対応している。将来的に異なる実装が必要になった場合は、ここに追加する。
+_DATABASE_OPENERS: dict[str, Callable[[Any], Any]] = {
+    "duckdb": _connect_duckdb,
+}
 
 
 class RuntimeFactory:
@@ -34,59 +45,58 @@ class RuntimeFactory:
 
     def __init__(self, config: "RuntimeConfig"):
         self.config = config
-
-    @staticmethod
-    def _load_adapter(module_path: str) -> ModuleType:
-        """モジュールを動的に読み込む
-
-        Registryに登録されているクラスを動的に読み込む
-
-        Args:
-            module_path(str): モジュールのパス
-
-        Returns:
-            type: モジュールのクラス
-        """
-        return importlib.import_module(module_path)
+        # 作成済みのオブジェクト。同じものを要求された場合は作り直さずに返す
+        self._storage = None
+        self._database = None
+        self._repositories: dict[str, Any] = {}
+        self._tagger = None
+        # 設定されているリポジトリ名(設定は不変なので初期化時に1回だけ取り出す)
+        self._repository_names = tuple(vars(config.repository))
 
     def create_storage(self):
-        config = self.config.storage
-        module_path = f"infrastructure.storage.{config.adapter_key}"
-
-        self._load_adapter(module_path)
+        if self._storage is not None:
+            return self._storage
 
+        config = self.config.storage
         accessor_cls = StorageAdapterRegistry.get(config.adapter_key, "accessor")
         operator_cls = StorageAdapterRegistry.get(config.adapter_key, "operator")
 
-        return Storage(accessor=accessor_cls.from_config(config), operator=operator_cls.from_config(config))
-
-    def _is_duckdb_config(self, config: "DataBaseConfig") -> TypeGuard["DuckDBConfig"]:
-        return config.adapter_key == "duckdb"
+        self._storage = Storage(accessor=accessor_cls.from_config(config), operator=operator_cls.from_config(config))
+        return self._storage
 
     def create_database(self):
         """データベース
 
-        NOTE: 現状はDuckDBのみ対応している。
-        将来的に異なる実装が必要になった場合は、設定とレジストリを追加する。
+        接続は初回の呼び出し時にのみ開き、以降は同じ接続を返す。
         """
-        config = self.config.database
-        if self._is_duckdb_config(config):
-            import duckdb
+        if self._database is not None:
+            return self._database
 
-            return duckdb.connect(config.database_file)
-        else:
+        config = self.config.database
+        opener = _DATABASE_OPENERS.get(config.adapter_key)
+        if opener is None:
             raise ValueError(f"Unsupported database adapter: {config.adapter_key}")
 
+        self._database = opener(config)
+        return self._database
+
     def create_repository(self, repo_name: str):
-        """リポジトリ"""
-        config = self.config.repository[repo_name]
-        module_path = f"infrastructure.repositories.{config.adapter_key}.{config.database.adapter_key}"
+        """リポジトリ
 
-        self._load_adapter(module_path)
+        リポジトリはrepo_nameごとに1つだけ作成する。
+        """
+        if repo_name in self._repositories:
+            return self._repositories[repo_name]
 
+        config = self.config.repository[repo_name]
         cls = RepositoryAdapterRegistry.get(config.adapter_key, config.database.adapter_key)
 
-        return cls.from_config(config)
+        # 接続はリポジトリ間で共有する
+        # NOTE: cursorはそれぞれ別のトランザクションを持つため、Unit of Workで複数のリポジトリへの書き込みを
+        # 1つのトランザクションにまとめられるよう、同じ接続をそのまま渡す
+        repository = cls.from_config(config, conn=self.create_database())
+        self._repositories[repo_name] = repository
+        return repository
 
     def create_unit_of_work(self):
         """Unit of Work
@@ -96,17 +106,17 @@ class RuntimeFactory:
         """
         from infrastructure.repositories.unit_of_work import UnitOfWork
 
-        repos = {repo_name: self.create_repository(repo_name) for repo_name in self.config.repository.__dict__}
+        repos = {repo_name: self.create_repository(repo_name) for repo_name in self._repository_names}
 
         return UnitOfWork(repos)
 
     def create_tagger(self):
         """タグ付けモデル"""
-        config = self.config.tagger
-        module_path = f"infrastructure.tagger.{config.adapter_key}"
-
-        self._load_adapter(module_path)
+        if self._tagger is not None:
+            return self._tagger
 
+        config = self.config.tagger
         cls = TaggerAdapterRegistry[config.adapter_key]
 
-        return cls.from_config(config)
+        self._tagger = cls.from_config(config)
+        return self._tagger
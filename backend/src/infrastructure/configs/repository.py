@@ -21,6 +21,7 @@ class RepositoryConfigGroup:
 
     images: RepositoryConfig
     model_tag: RepositoryConfig
+    hash_cache: RepositoryConfig
 
     def __getitem__(self, key: str) -> RepositoryConfig:
         return getattr(self, key)
@@ -50,3 +51,14 @@ class ModelTagRepositoryConfig(RepositoryConfig):
     def adapter_key(self) -> str:
         return "model_tag"
 
+
+@RepositoryConfigRegistry.register("hash_cache")
+@dataclass(frozen=True)
+class HashCacheRepositoryConfig(RepositoryConfig):
+    """画像ハッシュキャッシュRepository"""
+
+    table_name: str = "hash_cache"
+
+    @property
+    def adapter_key(self) -> str:
+        return "hash_cache"
@@ -20,6 +20,10 @@ class CamieV2TaggerModelConfig(TaggerModelConfig):
 
     model_dir: str = field(default_factory=lambda: str(get_root() / "data" / "model" / "camie-tagger-v2"))
     threshold: float = 0.0
+    # model_dir内のONNXモデルファイル名。FP16に変換したモデルを使う場合などに差し替える
+    model_file_name: str = "camie-tagger-v2.onnx"
+    # JPEGをデコード時に縮小するかどうか。前処理が速くなる代わりにモデル入力の画素値がわずかに変わる
+    use_jpeg_draft: bool = False
 
     @property
     def tag_table_name(self) -> str:
@@ -7,6 +7,7 @@ def initialize_database(storage: Storage, db_file: str, schema_file: str, overwr
     """DuckDBデータベースを初期化する
 
     既存のデータベースファイルが存在しない場合、新規に作成しスキーマを適用する。
+    存在する場合はスキーマを再適用し、後から追加されたテーブルなどを作成する(スキーマは再適用できるよう冪等に記述する)。
 
     Args:
         storage (Storage): ストレージ
@@ -14,15 +15,23 @@ def initialize_database(storage: Storage, db_file: str, schema_file: str, overwr
         schema_file (str): スキーマSQLファイルのパス
         overwrite (bool): 既存のデータベースファイルが存在する場合に上書きするかどうか
     """
-    if not storage.exists(schema_file):
-        raise FileNotFoundError(f"Schema file not found: {schema_file}")
-
-    schema_sql = storage.read_text(schema_file)
-
-    if overwrite and storage.exists(db_file):
+    # 存在確認と読み込みを分けず、読み込みの失敗で存在しないことを判定する
+    try:
+        schema_sql = storage.read_text(schema_file)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Schema file not found: {schema_file}") from e
+
+    exists = storage.exists(db_file)
+    if exists and overwrite:
         storage.delete(db_file)
 
+    # スキーマの適用途中で失敗した場合に中途半端なテーブルが残らないよう、1つのトランザクションで適用する
     with duckdb.connect(database=db_file) as conn:
+        conn.begin()
         conn.execute(schema_sql)
+        conn.commit()
 
-    print(f"Database initialized at: {db_file}")
+    if exists and not overwrite:
+        print(f"Database migrated at: {db_file}")
+    else:
+        print(f"Database initialized at: {db_file}")
@@ -1,4 +1,4 @@
-CREATE SEQUENCE image_id_seq START 1 INCREMENT 1;
+CREATE SEQUENCE IF NOT EXISTS image_id_seq START 1 INCREMENT 1;
 
 -----------------------------------
 -- 画像データテーブル
@@ -10,7 +10,7 @@ CREATE TABLE IF NOT EXISTS images (
     height         INTEGER,
     file_type      TEXT,
     hash           TEXT NOT NULL UNIQUE,
-    file_size      INTEGER,
+    file_size      BIGINT,
     added_at       TIMESTAMP DEFAULT NOW(),
     updated_at     TIMESTAMP DEFAULT NOW(),
 );
@@ -27,6 +27,24 @@ COMMENT ON COLUMN images.file_size      IS '画像ファイルのサイズ（バ
 COMMENT ON COLUMN images.added_at       IS '画像が取り込まれた日時';
 COMMENT ON COLUMN images.updated_at     IS '画像メタデータが最後に更新された日時';
 
+-----------------------------------
+-- 画像ハッシュキャッシュテーブル
+-- (作成済みのデータベースにもinit_dbで後から追加される)
+-----------------------------------
+CREATE TABLE IF NOT EXISTS hash_cache (
+    file_location  TEXT PRIMARY KEY,
+    file_size      BIGINT NOT NULL,
+    mtime          DOUBLE NOT NULL,
+    hash           TEXT NOT NULL
+);
+
+COMMENT ON TABLE hash_cache IS 'ファイルごとの画像ハッシュのキャッシュ（サイズと更新日時が変わっていなければ再計算しない）';
+
+COMMENT ON COLUMN hash_cache.file_location  IS '画像ファイルの保存場所（パス）';
+COMMENT ON COLUMN hash_cache.file_size      IS 'ハッシュ計算時のファイルサイズ（バイト数）';
+COMMENT ON COLUMN hash_cache.mtime          IS 'ハッシュ計算時のファイル更新日時（UNIX時間）';
+COMMENT ON COLUMN hash_cache.hash           IS '画像のハッシュ（SHA256）';
+
 -----------------------------------
 -- 画像メモテーブル
 -----------------------------------
@@ -5,3 +5,18 @@ StorageAdapterRegistry = NestedRegistry("storage_adapter")
 # DatabaseAdapterRegistry = Registry("database_adapter") # TODO: 将来的に異なる実装が必要になった場合は、設定とレジストリを追加する。
 TaggerAdapterRegistry = Registry("tagger_adapter")
 RepositoryAdapterRegistry = NestedRegistry("repository_adapter")
+
+
+# アダプターのモジュールは選択されたものだけを参照時にimportする
+StorageAdapterRegistry.register_lazy("local", "accessor", "infrastructure.storage.local", "LocalStorageAccessor")
+StorageAdapterRegistry.register_lazy("local", "operator", "infrastructure.storage.local", "LocalStorageOperator")
+TaggerAdapterRegistry.register_lazy("camie_v2", "infrastructure.tagger.camie_v2", "CamieTaggerV2")
+RepositoryAdapterRegistry.register_lazy(
+    "images", "duckdb", "infrastructure.repositories.images.duckdb", "DuckDBImagesRepository"
+)
+RepositoryAdapterRegistry.register_lazy(
+    "model_tag", "duckdb", "infrastructure.repositories.model_tag.duckdb", "DuckDBModelTagRepository"
+)
+RepositoryAdapterRegistry.register_lazy(
+    "hash_cache", "duckdb", "infrastructure.repositories.hash_cache.duckdb", "DuckDBHashCacheRepository"
+)
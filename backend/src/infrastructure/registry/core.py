@@ -1,9 +1,24 @@
+import importlib
+
 from collections.abc import Callable
+from typing import NamedTuple
+
+
+class _LazyEntry(NamedTuple):
+    """登録時にはimportせず、参照時にimportするクラスの場所"""
+
+    module_path: str
+    qualname: str
+
+    def load(self) -> type:
+        return getattr(importlib.import_module(self.module_path), self.qualname)
 
 
 class Registry:
     """クラスを登録するためのレジストリクラス"""
 
+    __slots__ = ("_map", "kind")
+
     def __init__(self, kind: str):
         self.kind = kind
         self._map = {}
@@ -31,21 +46,45 @@ class Registry:
 
         return wrapper
 
+    def register_lazy(self, name: str, module_path: str, qualname: str) -> None:
+        """モジュールをimportせずにクラスを登録する
+
+        クラスは初めて参照されたときにmodule_pathからimportされる。
+        使用しない実装のモジュールを読み込まずに済む。
+
+        Args:
+            name(str): クラス名
+            module_path(str): クラスを定義しているモジュールのパス
+            qualname(str): モジュール内のクラス名
+
+        Examples:
+            TaggerAdapterRegistry.register_lazy("camie_v2", "infrastructure.tagger.camie_v2", "CamieTaggerV2")
+        """
+        self._map[name] = _LazyEntry(module_path, qualname)
+
+    def _resolve(self, name: str) -> type:
+        cls = self._map[name]
+        if isinstance(cls, _LazyEntry):
+            cls = self._map[name] = cls.load()
+        return cls
+
     def __call__(self, name: str, *args, **kwargs):
         if name not in self._map:
             raise ValueError(f"Unknown {self.kind}: {name!r}")
-        return self._map[name](*args, **kwargs)
+        return self._resolve(name)(*args, **kwargs)
 
     def __getitem__(self, name: str) -> type:
-        return self._map[name]
+        return self._resolve(name)
 
 
 class NestedRegistry:
     """2軸レジストリ"""
 
+    __slots__ = ("_map", "kind")
+
     def __init__(self, kind: str):
         self.kind = kind
-        self._map: dict[str, dict[str, type]] = {}  # {category: {implementation: cls}}
+        self._map: dict[str, dict[str, type | _LazyEntry]] = {}  # {category: {implementation: cls}}
 
     def register(self, category: str, impl: str) -> Callable[[type], type]:
         """クラスを登録するためのデコレータ
@@ -69,11 +108,33 @@ class NestedRegistry:
 
         return wrapper
 
+    def register_lazy(self, category: str, impl: str, module_path: str, qualname: str) -> None:
+        """モジュールをimportせずにクラスを登録する
+
+        クラスは初めて参照されたときにmodule_pathからimportされる。
+
+        Args:
+            category(str): カテゴリ
+            impl(str): 実装
+            module_path(str): クラスを定義しているモジュールのパス
+            qualname(str): モジュール内のクラス名
+
+        Examples:
+            RepositoryAdapterRegistry.register_lazy(
+                "images", "duckdb", "infrastructure.repositories.images.duckdb", "DuckDBImagesRepository"
+            )
+        """
+        self._map.setdefault(category, {})[impl] = _LazyEntry(module_path, qualname)
+
     def get(self, category: str, impl: str) -> type:
         try:
-            return self._map[category][impl]
+            impls = self._map[category]
+            cls = impls[impl]
         except KeyError:
             raise ValueError(f"Unknown {self.kind}: category={category}, impl={impl!r}") from None
+        if isinstance(cls, _LazyEntry):
+            cls = impls[impl] = cls.load()
+        return cls
 
     def __call__(self, category: str, impl: str) -> type:
         return self.get(category, impl)
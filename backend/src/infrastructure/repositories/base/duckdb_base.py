@@ -1,41 +1,81 @@
+import copy
+
+from typing import Self
+
 import duckdb
 
 from infrastructure.configs.repository import RepositoryConfig
 
 
 class BaseDuckDBRepository:
-    """DuckDB基底リポジトリ"""
+    """DuckDB基底リポジトリ
+
+    接続はリポジトリごとに開かず、呼び出し元で開いた接続を受け取る。
+    同じデータベースを使うリポジトリ間で1つの接続を共有し、1つのトランザクションでまとめて書き込むため。
+    """
 
-    def __init__(self, database_file: str, table_name: str) -> None:
-        self._conn = duckdb.connect(database_file)
-        self._database_file = database_file
+    def __init__(self, conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+        self._conn = conn
         self._table_name = table_name
+        # SQL文字列 -> 解析済みのステートメント
+        self._statements: dict[str, duckdb.Statement] = {}
 
     @classmethod
-    def from_config(cls, config: RepositoryConfig) -> "BaseDuckDBRepository":
-        return cls(database_file=config.database.database_file, table_name=config.table_name)
+    def from_config(cls, config: RepositoryConfig, conn: duckdb.DuckDBPyConnection) -> "BaseDuckDBRepository":
+        return cls(conn=conn, table_name=config.table_name)
 
     @property
     def conn(self) -> duckdb.DuckDBPyConnection:
         return self._conn
 
+    def with_connection(self, conn: duckdb.DuckDBPyConnection) -> Self:
+        """同じテーブルを別の接続で操作するリポジトリを返す
+
+        DuckDBの接続は複数スレッドから同時に使えないため、別スレッドではconn.cursor()で作成した接続を渡して使う。
+
+        Args:
+            conn(duckdb.DuckDBPyConnection): 使用する接続
+
+        Returns:
+            Self: 接続のみを差し替えたリポジトリ
+        """
+        repository = copy.copy(self)
+        repository._conn = conn
+        repository._statements = {}
+        return repository
+
+    def _execute(self, query: str, parameters: object = None) -> duckdb.DuckDBPyConnection:
+        """クエリを実行する
+
+        同じSQLは初回のみ解析し、以降は解析済みのステートメントを使い回す。
+        値はパラメータで渡し、SQL文字列が呼び出しごとに変わらないようにすること。
+
+        Args:
+            query(str): 1つのSQL文
+            parameters(object): プレースホルダーに渡すパラメータ
+
+        Returns:
+            duckdb.DuckDBPyConnection: 実行結果を取得できる接続
+        """
+        statement = self._statements.get(query)
+        if statement is None:
+            statement = self._statements[query] = self._conn.extract_statements(query)[0]
+        return self._conn.execute(statement, parameters)
+
+    def begin(self) -> None:
+        """トランザクションを開始する
+
+        NOTE: 開始済みの接続でbeginするとDuckDBはそのトランザクションを中断する。
+        トランザクション中かどうかはUnit of Workで管理し、接続ごとに1回だけ呼び出すこと。
+        """
+        self._conn.begin()
+
     def commit(self) -> None:
         self._conn.commit()
 
     def rollback(self) -> None:
         self._conn.rollback()
 
-    @property
-    def database_file(self) -> str:
-        return self._database_file
-
     @property
     def table_name(self) -> str:
         return self._table_name
-
-    def sql_placeholders(self, values: list | tuple | set) -> str:
-        """list, tuple, setを?で囲んだ文字列に変換する"""
-        if not isinstance(values, (list, tuple, set)):
-            raise TypeError("values must be a list, tuple, or set")
-
-        return ",".join(["?"] * len(values))
@@ -0,0 +1,55 @@
+import duckdb
+
+from domain.entities.hash_cache import HashCacheEntry
+from domain.repositories.hash_cache import HashCacheRepository
+from domain.value_objects.file_location import FileLocation
+from domain.value_objects.image_hash import ImageHash
+from infrastructure.repositories.base.duckdb_base import BaseDuckDBRepository
+
+
+class DuckDBHashCacheRepository(BaseDuckDBRepository, HashCacheRepository):
+    """hash_cacheテーブルのリポジトリ"""
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+        super().__init__(conn=conn, table_name=table_name)
+
+    def _row_to_entity(self, row: tuple) -> HashCacheEntry:
+        (file_location, file_size, mtime, hash_value) = row
+        return HashCacheEntry(
+            file_location=FileLocation(file_location),
+            file_size=file_size,
+            mtime=mtime,
+            hash=ImageHash(hash_value),
+        )
+
+    def find_by_file_locations(self, file_locations: list[str]) -> list[HashCacheEntry]:
+        if not file_locations:
+            return []
+
+        q = f"""
+        SELECT file_location, file_size, mtime, hash FROM {self.table_name}
+        WHERE file_location IN (SELECT UNNEST(?::VARCHAR[]))
+        """
+        # 行ごとのタプルを作らずに列としてまとめて取得し、列を束ねてエンティティにする
+        columns = self._execute(q, [file_locations]).fetchnumpy()
+        rows = zip(*(column.tolist() for column in columns.values()), strict=True)
+        return [self._row_to_entity(row) for row in rows]
+
+    def upsert(self, entries: list[HashCacheEntry]) -> None:
+        if not entries:
+            return
+
+        # 列ごとのリストを配列パラメータとして渡し、1回のINSERTでまとめて追加・更新する
+        q = f"""
+        INSERT OR REPLACE INTO {self.table_name} (file_location, file_size, mtime, hash)
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::BIGINT[]), UNNEST(?::DOUBLE[]), UNNEST(?::VARCHAR[])
+        """
+        self._execute(
+            q,
+            [
+                [entry.file_location.value for entry in entries],
+                [entry.file_size for entry in entries],
+                [entry.mtime for entry in entries],
+                [entry.hash.value for entry in entries],
+            ],
+        )
@@ -1,5 +1,6 @@
+from typing import TYPE_CHECKING
+
 import duckdb
-import pandas as pd
 
 from domain.entities.images import ImageEntry
 from domain.exceptions import DuplicateImageError
@@ -8,16 +9,19 @@ from domain.repositories.images import ImagesRepository
 from domain.value_objects.file_location import FileLocation
 from domain.value_objects.image_hash import ImageHash
 from infrastructure.exceptions import InfrastructureError
-from infrastructure.registry.adapter import RepositoryAdapterRegistry
 from infrastructure.repositories.base.duckdb_base import BaseDuckDBRepository
 
 
-@RepositoryAdapterRegistry.register("images", "duckdb")
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
 class DuckDBImagesRepository(BaseDuckDBRepository, ImagesRepository, DebuggableRepository):
     """imagesテーブルのリポジトリ"""
 
-    def __init__(self, database_file: str, table_name: str) -> None:
-        super().__init__(database_file=database_file, table_name=table_name)
+    def __init__(self, conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+        super().__init__(conn=conn, table_name=table_name)
 
     def _row_to_entity(self, row: tuple) -> ImageEntry:
         (image_id, file_location, width, height, file_type, hash_value, file_size, added_at, updated_at) = row
@@ -52,19 +56,29 @@ class DuckDBImagesRepository(BaseDuckDBRepository, ImagesRepository, DebuggableR
         """
         if not entries:
             return []
+        # 列ごとのリストを配列パラメータとして渡し、DataFrameを作らずに1回のINSERTでまとめて追加する
+        _cols = "file_location, width, height, file_type, hash, file_size"
+        q = f"""
+        INSERT INTO {self.table_name} ({_cols})
+        SELECT UNNEST(?::VARCHAR[]), UNNEST(?::INTEGER[]), UNNEST(?::INTEGER[]),
+               UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[]), UNNEST(?::BIGINT[])
+        RETURNING image_id
+        """
+        params = [
+            [entry.file_location.value for entry in entries],
+            [entry.width for entry in entries],
+            [entry.height for entry in entries],
+            [entry.file_type for entry in entries],
+            [entry.hash.value for entry in entries],
+            [entry.file_size for entry in entries],
+        ]
         try:
-            df = pd.DataFrame([entry.to_dict() for entry in entries])
-            self.conn.register("img_df", df)
-            _cols = "file_location, width, height, file_type, hash, file_size"
-            q = f"INSERT INTO {self.table_name} ({_cols}) SELECT {_cols} FROM img_df RETURNING image_id"
-            result = self.conn.execute(q).fetchall()
+            result = self._execute(q, params).fetchall()
         except duckdb.ConstraintException as e:
             if "Duplicate key" in str(e) and "violates unique constraint" in str(e):
                 msg = "Duplicate hash detected during bulk insert"
                 raise DuplicateImageError(msg) from e
             raise InfrastructureError(e) from e
-        finally:
-            self.conn.unregister("img_df")
 
         return [row[0] for row in result]
 
@@ -73,12 +87,13 @@ class DuckDBImagesRepository(BaseDuckDBRepository, ImagesRepository, DebuggableR
             raise ValueError("image_ids must be a list of integers and not empty")
         image_ids = [image_ids] if isinstance(image_ids, int) else image_ids
 
-        q = f"DELETE FROM {self.table_name} WHERE image_id IN ({self.sql_placeholders(image_ids)})"
-        self.conn.execute(q, image_ids)
+        # IDのリストを1つの配列パラメータとして渡し、件数によらず同じSQLになるようにする
+        q = f"DELETE FROM {self.table_name} WHERE image_id IN (SELECT UNNEST(?::INTEGER[]))"
+        self._execute(q, [list(image_ids)])
 
     def get(self, image_id: int) -> ImageEntry | None:
         q = f"SELECT * FROM {self.table_name} WHERE image_id = ?"
-        result = self.conn.execute(q, (image_id,)).fetchone()
+        result = self._execute(q, (image_id,)).fetchone()
         return self._row_to_entity(result) if result else None
 
     def find_by_hashes(self, hash_values: ImageHash | list[ImageHash]) -> list[ImageEntry]:
@@ -86,16 +101,39 @@ class DuckDBImagesRepository(BaseDuckDBRepository, ImagesRepository, DebuggableR
             return []
         hash_values = [hash_values] if isinstance(hash_values, ImageHash) else hash_values
 
+        # ハッシュのリストを1つの配列パラメータとして渡し、件数によらず同じSQLになるようにする
         hash_strings = [str(hash_value) for hash_value in hash_values]
-        q = f"SELECT * FROM {self.table_name} WHERE hash IN ({self.sql_placeholders(hash_strings)})"
-        result = self.conn.execute(q, hash_strings).fetchall()
+        q = f"SELECT * FROM {self.table_name} WHERE hash IN (SELECT UNNEST(?::VARCHAR[]))"
+        result = self._execute(q, [hash_strings]).fetchall()
         return [self._row_to_entity(row) for row in result]
 
+    def find_existing_hash_values(self, hash_values: list[ImageHash]) -> set[str]:
+        if not hash_values:
+            return set()
+
+        q = f"SELECT hash FROM {self.table_name} WHERE hash IN (SELECT UNNEST(?::VARCHAR[]))"
+        result = self._execute(q, [[str(h) for h in hash_values]]).fetchnumpy()
+        return set(result["hash"].tolist())
+
+    def list_hash_values(self) -> list[str]:
+        # 件数が多くなるため、行ごとのタプルを作らずに列としてまとめて取得する
+        q = f"SELECT hash FROM {self.table_name}"
+        result = self._execute(q).fetchnumpy()
+        return result["hash"].tolist()
+
+    def list_hash_prefixes(self, prefix_bits: int) -> "np.ndarray":
+        # ハッシュごとの文字列を作らないよう、先頭の16進文字列をDB側で整数に変換して重複を除く
+        q = f"SELECT DISTINCT ('0x' || substr(hash, 1, ?))::UINTEGER AS prefix FROM {self.table_name}"
+        result = self._execute(q, [prefix_bits // 4]).fetchnumpy()
+        return result["prefix"]
+
     def update(self, entities: list[ImageEntry]) -> None:
         if not entities:
             raise ValueError("entities must be a list of ImageEntry and not empty")
         entities = [entities] if isinstance(entities, ImageEntry) else entities
 
+        import pandas as pd
+
         df = pd.DataFrame([entry.to_dict() for entry in entities])
         self.conn.register("img_df", df)
         _cols = ["file_location", "width", "height", "file_type", "file_size"]
@@ -106,22 +144,22 @@ class DuckDBImagesRepository(BaseDuckDBRepository, ImagesRepository, DebuggableR
             FROM img_df
             WHERE {self.table_name}.image_id = img_df.image_id
             """
-            self.conn.execute(q)
+            self._execute(q)
         finally:
             self.conn.unregister("img_df")
 
     def contains(self, image_id: int) -> bool:
         q = f"SELECT COUNT(*) FROM {self.table_name} WHERE image_id = ?"
-        result = self.conn.execute(q, (image_id,)).fetchone()
+        result = self._execute(q, (image_id,)).fetchone()
         return result[0] > 0 if result else False
 
     # ---- For Debugging ----
     def count(self) -> int:
         q = f"SELECT COUNT(*) FROM {self.table_name}"
-        result = self.conn.execute(q).fetchone()
+        result = self._execute(q).fetchone()
         return result[0] if result else 0
 
-    def list_all_as_df(self, limit: int = 20) -> pd.DataFrame:
+    def list_all_as_df(self, limit: int = 20) -> "pd.DataFrame":
         q = f"SELECT * FROM {self.table_name} LIMIT ?"
-        result = self.conn.execute(q, (limit,)).fetchdf()
+        result = self._execute(q, (limit,)).fetchdf()
         return result
@@ -1,6 +1,8 @@
 import itertools
 
-import pandas as pd
+from typing import TYPE_CHECKING
+
+import duckdb
 
 from duckdb import ConstraintException
 
@@ -9,26 +11,18 @@ from domain.exceptions import ImageNotFoundError
 from domain.repositories.debugging import DebuggableRepository
 from domain.repositories.model_tag import ModelTagRepository
 from infrastructure.exceptions import InfrastructureError
-from infrastructure.registry.adapter import RepositoryAdapterRegistry
 from infrastructure.repositories.base.duckdb_base import BaseDuckDBRepository
 
 
-@RepositoryAdapterRegistry.register("model_tag", "duckdb")
+if TYPE_CHECKING:
+    import pandas as pd
+
+
 class DuckDBModelTagRepository(BaseDuckDBRepository, ModelTagRepository, DebuggableRepository):
     """DuckDBを使用したModelTagRepositoryの実装"""
 
-    def __init__(self, database_file: str, table_name: str) -> None:
-        super().__init__(database_file=database_file, table_name=table_name)
-
-    def _row_to_entity(self, row: tuple) -> ModelTagEntry:
-        (image_id, category, tag, score, archived) = row
-        return ModelTagEntry(
-            image_id=image_id,
-            category=category,
-            tag=tag,
-            score=score,
-            archived=archived,
-        )
+    def __init__(self, conn: duckdb.DuckDBPyConnection, table_name: str) -> None:
+        super().__init__(conn=conn, table_name=table_name)
 
     def add(self, entries: ModelTagEntries | list[ModelTagEntries]) -> None:
         entries = [entries] if isinstance(entries, ModelTagEntries) else entries
@@ -50,42 +44,56 @@ class DuckDBModelTagRepository(BaseDuckDBRepository, ModelTagRepository, Debugga
         if not entries:
             return
 
+        flatten_entries = list(itertools.chain.from_iterable(entry.entries for entry in entries))
+
+        # 列ごとのリストを配列パラメータとして渡し、DataFrameを作らずに1回のINSERTでまとめて追加する
+        _cols = "image_id, category, tag, score, archived"
+        q = f"""
+        INSERT OR REPLACE INTO {self.table_name} ({_cols})
+        SELECT UNNEST(?::INTEGER[]), UNNEST(?::VARCHAR[]), UNNEST(?::VARCHAR[]), UNNEST(?::DOUBLE[]), UNNEST(?::BOOLEAN[])
+        """
+        params = [
+            [entry.image_id for entry in flatten_entries],
+            [entry.category for entry in flatten_entries],
+            [entry.tag for entry in flatten_entries],
+            [entry.score for entry in flatten_entries],
+            [entry.archived for entry in flatten_entries],
+        ]
         try:
-            flatten_entries = list(itertools.chain.from_iterable([entry.to_dict_list() for entry in entries]))
-            tag_df = pd.DataFrame(flatten_entries)
-            self.conn.register("tag_df", tag_df)
-            _cols = "image_id, category, tag, score, archived"
-            q = f"INSERT OR REPLACE INTO {self.table_name} ({_cols}) SELECT {_cols} FROM tag_df"
-            self.conn.execute(q)
+            self._execute(q, params)
         except ConstraintException as e:
             if "Violates foreign key constraint" in str(e) and "does not exist in the referenced table" in str(e):
                 msg = "Image ID not found"
                 raise ImageNotFoundError(msg) from e
             raise InfrastructureError(e) from e
-        finally:
-            self.conn.unregister("tag_df")
 
     def get(self, image_id: int) -> ModelTagEntries:
-        q = f"SELECT * FROM {self.table_name} WHERE image_id = ?"
-        result = self.conn.execute(q, (image_id,)).fetchall()
-        return (
-            ModelTagEntries(entries=[self._row_to_entity(row) for row in result])
-            if result
-            else ModelTagEntries(entries=[])
-        )
+        # 列の並びをModelTagEntryのフィールド順に揃え、行のタプルをそのまま位置引数として渡す
+        q = f"SELECT image_id, category, tag, score, archived FROM {self.table_name} WHERE image_id = ?"
+        result = self._execute(q, (image_id,)).fetchall()
+        return ModelTagEntries(entries=list(itertools.starmap(ModelTagEntry, result)))
 
     def remove_all_by_image_id(self, image_id: int) -> int:
         q = f"DELETE FROM {self.table_name} WHERE image_id = ?"
-        result = self.conn.execute(q, (image_id,))
-        return result.rowcount
+        result = self._execute(q, (image_id,)).fetchone()
+        return result[0] if result else 0
+
+    def remove_all_by_image_ids(self, image_ids: list[int]) -> int:
+        if not image_ids:
+            return 0
+
+        # 複数画像のタグも1回のDELETEでまとめて削除する
+        q = f"DELETE FROM {self.table_name} WHERE image_id IN (SELECT UNNEST(?::INTEGER[]))"
+        result = self._execute(q, [list(image_ids)]).fetchone()
+        return result[0] if result else 0
 
     # ---- For Debugging ----
     def count(self) -> int:
         q = f"SELECT COUNT(*) FROM {self.table_name}"
-        result = self.conn.execute(q).fetchone()
+        result = self._execute(q).fetchone()
         return result[0] if result else 0
 
-    def list_all_as_df(self, limit: int = 20) -> pd.DataFrame:
+    def list_all_as_df(self, limit: int = 20) -> "pd.DataFrame":
         q = f"SELECT * FROM {self.table_name} LIMIT ?"
-        result = self.conn.execute(q, (limit,)).fetchdf()
+        result = self._execute(q, (limit,)).fetchdf()
         return result
@@ -1,21 +1,38 @@
+from typing import Any
+
 from domain.repositories.unit_of_work import SupportedRepository
 
 
 class UnitOfWork:
-    """Unit of Work実装"""
+    """Unit of Work実装
+
+    同じ接続を共有するリポジトリは1つのトランザクションになる。
+    入れ子やsubsetで同じ接続のUnit of Workに入った場合は、外側で開始したトランザクションにそのまま参加し、
+    コミット・ロールバックはトランザクションを開始したUnit of Workのみが行う。
+    トランザクション中の接続はsubsetで作成したUnit of Workとだけ共有し、無関係なUnit of Workやfor_threadで作成したものとは共有しない。
+    """
 
     def __init__(self, repositories: dict[str, SupportedRepository]) -> None:
         self.repositories = repositories
+        # トランザクション中の接続のID
+        # NOTE: 接続はこのUnit of Workのリポジトリが保持しているため、利用中にIDが別の接続に再利用されることはない
+        self._active_connections: set[int] = set()
+        # __enter__ごとに、そのブロックで開始したトランザクションの(接続ID, リポジトリ)を積む
+        self._opened_stack: list[list[tuple[int, SupportedRepository]]] = []
+        # for_threadで作成し、closeで閉じる接続
+        self._owned_connections: list[Any] = []
 
     def _validate_repositories(self, repos: dict[str, SupportedRepository]) -> None:
         if not isinstance(repos, dict):
             raise ValueError("repositories must be a dict. (key: repository name, value: Repository instance)")
 
-        if not all(hasattr(repo, "commit") and hasattr(repo, "rollback") for repo in repos.values()):
-            raise ValueError("repository values must have commit and rollback methods")
-
-        if not all(isinstance(name, str) for name in repos):
-            raise ValueError("repository keys must be strings (repository names)")
+        # キーと値の検証を1回の走査で行う
+        for name, repo in repos.items():
+            # 引数の検証エラーはdictの検証と同じくValueErrorで統一する
+            if not isinstance(name, str):
+                raise ValueError("repository keys must be strings (repository names)")  # noqa: TRY004
+            if not (hasattr(repo, "commit") and hasattr(repo, "rollback")):
+                raise ValueError("repository values must have commit and rollback methods")
 
     @property
     def repositories(self) -> dict[str, SupportedRepository]:
@@ -25,6 +42,11 @@ class UnitOfWork:
     def repositories(self, value: dict[str, SupportedRepository]) -> None:
         self._validate_repositories(value)
         self._repositories = value
+        # 同じ接続を共有するリポジトリは1つのトランザクションになるため、トランザクション操作は接続ごとに1回だけ行う
+        transaction_owners: dict[int, SupportedRepository] = {}
+        for repository in value.values():
+            transaction_owners.setdefault(id(getattr(repository, "conn", repository)), repository)
+        self._transaction_owners = transaction_owners
 
     def __getitem__(self, key: str) -> SupportedRepository:
         if key in self._repositories:
@@ -32,17 +54,96 @@ class UnitOfWork:
         raise AttributeError(f"Repository {key} not found")
 
     def subset(self, keys: list[str]) -> "UnitOfWork":
-        return UnitOfWork(repositories={name: self.repositories[name] for name in keys})
+        unit_of_work = UnitOfWork(repositories={name: self.repositories[name] for name in keys})
+        # 同じ接続を使うため、外側で開始したトランザクションに参加できるよう状態を共有する
+        unit_of_work._active_connections = self._active_connections
+        return unit_of_work
+
+    def for_thread(self) -> "UnitOfWork":
+        """別スレッドで使うUnit of Workを作成する
+
+        接続を共有するリポジトリごとに、その接続のカーソル(独立した接続)を作成して差し替える。
+        接続を差し替えられないリポジトリはそのまま共有する。
+        使い終わったらcloseで作成したカーソルを閉じること。
+
+        Returns:
+            UnitOfWork: 別スレッドで使うUnit of Work
+        """
+        cursors: dict[int, Any] = {}
+        repositories: dict[str, SupportedRepository] = {}
+        for name, repository in self._repositories.items():
+            conn = getattr(repository, "conn", None)
+            with_connection = getattr(repository, "with_connection", None)
+            if conn is None or with_connection is None:
+                repositories[name] = repository
+                continue
+            if id(conn) not in cursors:
+                cursors[id(conn)] = conn.cursor()
+            repositories[name] = with_connection(cursors[id(conn)])
+
+        # カーソルは元の接続とは別のトランザクションを持つため、トランザクションの状態は共有しない
+        unit_of_work = UnitOfWork(repositories)
+        unit_of_work._owned_connections = list(cursors.values())
+        return unit_of_work
+
+    def close(self) -> None:
+        """for_threadで作成した接続を閉じる"""
+        for conn in self._owned_connections:
+            conn.close()
+        self._owned_connections = []
+
+    def _begin(self) -> None:
+        """トランザクション中でない接続のトランザクションを開始する"""
+        opened: list[tuple[int, SupportedRepository]] = []
+        try:
+            for conn_id, repository in self._transaction_owners.items():
+                # NOTE: 開始済みの接続でbeginするとDuckDBはそのトランザクションを中断するため、外側に参加する
+                if conn_id in self._active_connections:
+                    continue
+                # beginを持たないリポジトリは自動コミットで書き込む
+                begin = getattr(repository, "begin", None)
+                if begin is not None:
+                    begin()
+                self._active_connections.add(conn_id)
+                opened.append((conn_id, repository))
+        except BaseException:
+            self._rollback_opened(opened)
+            raise
+        self._opened_stack.append(opened)
 
     def _commit(self) -> None:
-        for repository in self._repositories.values():
-            repository.commit()
+        """このUnit of Workで開始したトランザクションをコミットする"""
+        opened = self._opened_stack.pop()
+        for i, (_, repository) in enumerate(opened):
+            try:
+                repository.commit()
+            except BaseException:
+                # NOTE: コミットに失敗したトランザクションはDuckDBが終了させるため、未コミットの残りだけを取り消す
+                self._rollback_opened(opened[i + 1 :])
+                self._release(opened)
+                raise
+        self._release(opened)
 
     def _rollback(self) -> None:
-        for repository in self._repositories.values():
-            repository.rollback()
+        """このUnit of Workで開始したトランザクションをロールバックする"""
+        self._rollback_opened(self._opened_stack.pop())
+
+    def _rollback_opened(self, opened: list[tuple[int, SupportedRepository]]) -> None:
+        try:
+            for _, repository in opened:
+                # beginを持たないリポジトリは自動コミットのため、取り消すトランザクションがない
+                if hasattr(repository, "begin"):
+                    repository.rollback()
+        finally:
+            self._release(opened)
+
+    def _release(self, opened: list[tuple[int, SupportedRepository]]) -> None:
+        for conn_id, _ in opened:
+            self._active_connections.discard(conn_id)
 
     def __enter__(self) -> "UnitOfWork":
+        # ブロック内の書き込みを1つのトランザクションにまとめ、コミットを1回にする
+        self._begin()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -1,19 +1,18 @@
 import os
 import shutil
+import sys
 
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from application.storage.ports import StorageAccessor, StorageOperator
-from infrastructure.registry.adapter import StorageAdapterRegistry
 
 
 if TYPE_CHECKING:
     from infrastructure.configs.storage import LocalStorageConfig
 
 
-@StorageAdapterRegistry.register("local", "accessor")
 class LocalStorageAccessor(StorageAccessor):
     """Query操作"""
 
@@ -37,39 +36,57 @@ class LocalStorageAccessor(StorageAccessor):
                     elif entry.is_file(follow_symlinks=False) or entry.is_symlink():
                         yield entry.path
 
+    def _scan_flat(self, path: str) -> Generator[str, None, None]:
+        """直下のファイルのみ走査"""
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False) or entry.is_symlink():
+                    yield entry.path
+
     def list_files(self, path: str | Path, recursive: bool = False) -> list[str]:
+        return list(self.iter_files(path, recursive))
+
+    def iter_files(self, path: str | Path, recursive: bool = False) -> Iterator[str]:
+        # パスの検証は呼び出し時に行い、走査のみを遅延させる
         p = Path(path)
         if not p.exists():
             raise FileNotFoundError
 
         if p.is_file():
-            return [str(p)]
+            return iter([str(p)])
 
-        if recursive:
-            return list(self._scan_fast(str(p)))
+        return self._scan_fast(str(p)) if recursive else self._scan_flat(str(p))
 
-        with os.scandir(p) as it:
-            return [entry.path for entry in it if entry.is_file(follow_symlinks=False) or entry.is_symlink()]
+    # NOTE: 以下は画像1件ごとに呼ばれるため、Pathを生成せずにos/os.pathの関数を直接使う
 
     def exists(self, path: str | Path, *, follow_symlinks: bool = True) -> bool:
-        return Path(path).exists(follow_symlinks=follow_symlinks)
+        return os.path.exists(path) if follow_symlinks else os.path.lexists(path)
 
     def get_size(self, path: str | Path) -> int:
-        return Path(path).stat().st_size
+        return os.stat(path).st_size
+
+    def get_mtime(self, path: str | Path) -> float:
+        return os.stat(path).st_mtime
+
+    def stat(self, path: str | Path) -> tuple[int, float]:
+        # サイズと更新日時を1回のシステムコールで取得する
+        stat_result = os.stat(path)
+        return stat_result.st_size, stat_result.st_mtime
 
     def read_binary(self, path: str | Path) -> bytes:
-        with Path(path).open("rb") as fp:
+        # ファイル全体を1回で読み込むため、バッファリング層を挟まずに読み込む
+        with open(path, "rb", buffering=0) as fp:
             return fp.read()
 
     def read_text(self, path: str | Path, encoding: str = "utf-8") -> str:
-        with Path(path).open("r", encoding=encoding) as fp:
+        with open(path, encoding=encoding) as fp:
             return fp.read()
 
     def get_file_extension(self, path: str | Path) -> str:
-        return Path(path).suffix.lower().lstrip(".")
+        # 拡張子の種類は少ないため、intern済みの文字列を共有してエントリごとに文字列を保持しない
+        return sys.intern(os.path.splitext(path)[1].lower().lstrip("."))
 
 
-@StorageAdapterRegistry.register("local", "operator")
 class LocalStorageOperator(StorageOperator):
     """Command操作"""
 
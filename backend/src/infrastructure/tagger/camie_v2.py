@@ -1,37 +1,57 @@
 """タグ付けモデルによる画像のタグ推論とカテゴリ分類"""
 
 import json
+import threading
 
 from io import BytesIO
 from pathlib import Path
-from typing import Final
-
-import numpy as np
-import onnxruntime
-
-from PIL import Image
-from torchvision import transforms
+from typing import TYPE_CHECKING, Final
 
 from application.storage.ports import Storage
 from domain.exceptions import TaggingError
 from domain.tagger.result import TaggerResult
 from domain.tagger.tagger import Tagger
 from infrastructure.configs.tagger import CamieV2TaggerModelConfig
-from infrastructure.registry.adapter import TaggerAdapterRegistry
 
 
-@TaggerAdapterRegistry.register("camie_v2")
+if TYPE_CHECKING:
+    import numpy as np
+    import onnxruntime
+
+
 class CamieTaggerV2(Tagger):
     """タグ付けモデルによる画像のタグ推論とカテゴリ分類を行うクラス
 
     モデルについて: Camais03/camie-tagger-v2 · Hugging Face](https://huggingface.co/Camais03/camie-tagger-v2)
     """
 
-    def __init__(self, model_dir: str, threshold: float = 0.5) -> None:
+    # モデル入力の画像サイズ(縦横共通)
+    INPUT_SIZE: Final[int] = 512
+    # 正規化に使うRGBごとの平均と標準偏差(ImageNet)
+    NORMALIZE_MEAN: Final[tuple[float, float, float]] = (0.485, 0.456, 0.406)
+    NORMALIZE_STD: Final[tuple[float, float, float]] = (0.229, 0.224, 0.225)
+
+    # ONNXの入力型 -> 前処理で生成するテンソルのdtype
+    _INPUT_DTYPES: Final[dict[str, str]] = {
+        "tensor(float)": "float32",
+        "tensor(float16)": "float16",
+    }
+
+    def __init__(
+        self,
+        model_dir: str,
+        threshold: float = 0.5,
+        model_file_name: str = "camie-tagger-v2.onnx",
+        use_jpeg_draft: bool = False,
+    ) -> None:
         """初期化
 
         Args:
+            model_dir (str): モデルとメタデータを配置したディレクトリ
             threshold (float): タグ推論スコア(logit)の閾値。これ以上のスコアのタグのみを結果に含める。
+            model_file_name (str): model_dir内のONNXモデルファイル名
+            use_jpeg_draft (bool): JPEGをデコード時に縮小(draft)するかどうか。
+                大きなJPEGのデコードが速くなる代わりに、縮小方法が変わるためモデル入力の画素値がわずかに変わる
 
         参考: logit と確率 (sigmoid) の対応表
             Logit | Prob (sigmoid) | 意味のざっくりした解釈
@@ -50,17 +70,37 @@ class CamieTaggerV2(Tagger):
 
         """
         self.threshold = threshold
-        self.model_file: Final[str] = str(Path(model_dir) / "camie-tagger-v2.onnx")
+        self.use_jpeg_draft = use_jpeg_draft
+        self.model_file: Final[str] = str(Path(model_dir) / model_file_name)
         self.metadata_file: Final[str] = str(Path(model_dir) / "camie-tagger-v2-metadata.json")
 
         self.tag_to_idx: dict = {}
         self.tag_to_category: dict = {}
+        # 後処理で使う、tag_to_idxの並び順に対応したタグ名とインデックスの配列
+        self._tag_names: list[str] = []
+        self._tag_categories: list[str] = []
+        self._tag_indices: np.ndarray | None = None
         self.session: onnxruntime.InferenceSession | None = None
         self.input_name: str | None = None
+        # モデル入力のバッチ次元が固定されている場合のバッチサイズ(可変の場合はNone)
+        self.max_batch_size: int | None = None
+        # モデル入力のdtype。FP16のモデルにはFP16のテンソルを直接生成して渡す
+        self.input_dtype: str = "float32"
+
+        # 正規化の係数(pixel * scale - offset)。initializeで生成する
+        self._pixel_scale: np.ndarray | None = None
+        self._pixel_offset: np.ndarray | None = None
+        # スレッドごとに使い回すモデル入力バッファ
+        self._buffers = threading.local()
 
     @classmethod
     def from_config(cls, config: CamieV2TaggerModelConfig) -> "CamieTaggerV2":
-        return cls(model_dir=config.model_dir, threshold=config.threshold)
+        return cls(
+            model_dir=config.model_dir,
+            threshold=config.threshold,
+            model_file_name=config.model_file_name,
+            use_jpeg_draft=config.use_jpeg_draft,
+        )
 
     def _load_tag_mappings(self, storage: Storage) -> tuple[dict, dict]:
         """メタデータJSONからタグ関連情報を読み込む
@@ -77,79 +117,169 @@ class CamieTaggerV2(Tagger):
         tag_to_category = metadata["dataset_info"]["tag_mapping"]["tag_to_category"]
         return tag_to_idx, tag_to_category
 
-    def _start_session(self) -> onnxruntime.InferenceSession:
+    def _start_session(self) -> "onnxruntime.InferenceSession":
         """ONNX推論セッションの開始
 
         Returns:
             onnxruntime.InferenceSession: ONNX推論セッション
         """
+        import onnxruntime
+
         providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
         session = onnxruntime.InferenceSession(self.model_file, providers=providers)
         return session
 
     def initialize(self, storage: Storage) -> None:
         """モデルとメタデータの読み込み、推論セッションの開始"""
+        import numpy as np
+
         self.tag_to_idx, self.tag_to_category = self._load_tag_mappings(storage)
+        self._tag_names = list(self.tag_to_idx.keys())
+        self._tag_categories = [self.tag_to_category.get(tag, "unknown") for tag in self._tag_names]
+        self._tag_indices = np.fromiter(self.tag_to_idx.values(), dtype=np.intp, count=len(self.tag_to_idx))
+
+        self._init_normalization()
         self.session = self._start_session()
-        self.input_name = self.session.get_inputs()[0].name
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch_dim = model_input.shape[0]
+        self.max_batch_size = batch_dim if isinstance(batch_dim, int) else None
+        if model_input.type not in self._INPUT_DTYPES:
+            msg = f"Unsupported model input type: {model_input.type}"
+            raise TaggingError(msg)
+        self.input_dtype = self._INPUT_DTYPES[model_input.type]
+
+    def _init_normalization(self) -> None:
+        """正規化の係数を生成する"""
+        import numpy as np
+
+        # ToTensor(/255)とNormalize((x - mean) / std)を1回の乗算と減算にまとめる
+        mean = np.asarray(self.NORMALIZE_MEAN, dtype=np.float32).reshape(3, 1, 1)
+        std = np.asarray(self.NORMALIZE_STD, dtype=np.float32).reshape(3, 1, 1)
+        self._pixel_scale = 1.0 / (255.0 * std)
+        self._pixel_offset = mean / std
+
+    def _preprocess_image_into(self, image_binary: bytes, out: "np.ndarray") -> None:
+        """画像を読み込み、モデルに入力できるテンソルとしてoutに書き込む
 
-    def _preprocess_image(self, image_binary: bytes) -> np.ndarray:
+        Args:
+            image_binary(bytes): 画像バイナリ
+            out(np.ndarray): 書き込み先のテンソル(shape = (3, 512, 512), dtype = input_dtype)
+        """
+        import numpy as np
+
+        from PIL import Image
+
+        image = Image.open(BytesIO(image_binary))
+        # JPEGはデコード時にDCTスケーリングで縮小し、デコード後の画像全体をメモリに展開しないようにする
+        # (モデル入力サイズを下回らない範囲で1/2, 1/4, 1/8に縮小される)
+        if self.use_jpeg_draft and image.format == "JPEG":
+            image.draft("RGB", (self.INPUT_SIZE, self.INPUT_SIZE))
+        image = image.convert("RGB")
+        image = image.resize((self.INPUT_SIZE, self.INPUT_SIZE), Image.Resampling.BILINEAR)
+
+        # HWC(uint8) -> CHW(input_dtype) の変換と正規化を、新しい配列を作らずにoutへ直接書き込む
+        pixels = np.asarray(image).transpose(2, 0, 1)
+        np.multiply(pixels, self._pixel_scale, out=out)
+        np.subtract(out, self._pixel_offset, out=out)
+
+    def _preprocess_image(self, image_binary: bytes) -> "np.ndarray":
         """画像を読み込み、モデルに入力できるテンソルへ変換する
 
         Args:
             image_binary(bytes): 画像バイナリ
 
         Returns:
-            np.ndarray: モデルに入力できるテンソル
+            np.ndarray: モデルに入力できるテンソル(バッチ次元なし, shape = (3, 512, 512))
         """
-        image = Image.open(BytesIO(image_binary)).convert("RGB")
-
-        transform = transforms.Compose(
-            [
-                transforms.Resize((512, 512)),
-                transforms.ToTensor(),
-                transforms.Normalize(
-                    mean=[0.485, 0.456, 0.406],
-                    std=[0.229, 0.224, 0.225],
-                ),
-            ],
-        )
+        import numpy as np
+
+        tensor = np.empty((3, self.INPUT_SIZE, self.INPUT_SIZE), dtype=self.input_dtype)
+        self._preprocess_image_into(image_binary, out=tensor)
+        return tensor
 
-        tensor = transform(image).unsqueeze(0)
-        return tensor.numpy().astype(np.float32)
+    def _get_input_buffer(self) -> "np.ndarray":
+        """呼び出し元スレッド専用のモデル入力バッファ(shape = (1, 3, 512, 512))を取得する"""
+        import numpy as np
 
-    def _categorize_tag_scores(self, tag_scores: dict) -> dict[str, list]:
+        buffer = getattr(self._buffers, "input", None)
+        if buffer is None or buffer.dtype != self.input_dtype:
+            buffer = np.empty((1, 3, self.INPUT_SIZE, self.INPUT_SIZE), dtype=self.input_dtype)
+            self._buffers.input = buffer
+        return buffer
+
+    def _categorize_tag_scores(self, indices: "np.ndarray", scores: "np.ndarray") -> dict[str, list[tuple[str, float]]]:
         """推論スコアをカテゴリごとに分類してソートする
 
         Args:
-            tag_scores(dict): タグ名 -> スコア
+            indices(np.ndarray): 閾値以上のタグの位置(_tag_namesのインデックス)
+            scores(np.ndarray): _tag_namesの並び順に対応した全タグのスコア
 
         Returns:
-            dict[str, list]: カテゴリ -> タグ名とスコアのリスト
+            dict[str, list[tuple[str, float]]]: カテゴリ -> (タグ名, スコア)のリスト。スコアはPythonのfloat
         """
-        categorized_tags: dict[str, list] = {}
+        import numpy as np
 
-        for tag, score in tag_scores.items():
-            category = self.tag_to_category.get(tag, "unknown")
-            categorized_tags.setdefault(category, []).append((tag, score))
+        # 先にスコアの降順(同点は元の順番)に並べておき、分類後のカテゴリごとのソートを不要にする
+        selected_scores = scores[indices]
+        order = np.argsort(-selected_scores, kind="stable")
 
-        # カテゴリ内はスコア順に並べ替え
-        for items in categorized_tags.values():
-            items.sort(key=lambda x: -x[1])
+        categorized_tags: dict[str, list[tuple[str, float]]] = {}
+        tag_names, tag_categories = self._tag_names, self._tag_categories
+        for i, score in zip(indices[order].tolist(), selected_scores[order].tolist(), strict=True):
+            categorized_tags.setdefault(tag_categories[i], []).append((tag_names[i], score))
 
         return categorized_tags
 
-    def tag(self, image_binary: bytes) -> TaggerResult:
+    def preprocess(self, image_binary: bytes) -> "np.ndarray":
         try:
-            input_tensor = self._preprocess_image(image_binary)
-            if self.session is None:
-                msg = "The model session is not initialized. Call 'initialize()' first."
-                raise RuntimeError(msg)
+            return self._preprocess_image(image_binary)
+        except Exception as e:
+            raise TaggingError(f"Tagging failed: {e}") from e
+
+    def predict_batch(self, inputs: list["np.ndarray"]) -> list["np.ndarray"]:
+        import numpy as np
+
+        if self.session is None:
+            msg = "The model session is not initialized. Call 'initialize()' first."
+            raise RuntimeError(msg)
+
+        # バッチ次元が固定されているモデルはその大きさずつに分割して推論する
+        step = self.max_batch_size or len(inputs)
+        try:
+            predictions: list[np.ndarray] = []
+            for i in range(0, len(inputs), step):
+                batch = np.stack(inputs[i : i + step])
+                outputs = self.session.run(None, {self.input_name: batch})
+                predictions.extend(outputs[1])  # shape = (batch, 70527)
+            return predictions
+        except Exception as e:
+            raise TaggingError(f"Tagging failed: {e}") from e
+
+    def predict(self, image_binary: bytes) -> "np.ndarray":
+        if self.session is None:
+            msg = "The model session is not initialized. Call 'initialize()' first."
+            raise RuntimeError(msg)
 
+        try:
+            # 1画像ずつの推論では、スレッドごとの入力バッファに前処理結果を書き込んで使い回す
+            input_tensor = self._get_input_buffer()
+            self._preprocess_image_into(image_binary, out=input_tensor[0])
             outputs = self.session.run(None, {self.input_name: input_tensor})
-            pred = outputs[1][0]  # shape = (70527,)
+            return outputs[1][0]  # shape = (70527,)
+        except Exception as e:
+            raise TaggingError(f"Tagging failed: {e}") from e
 
-            tag_scores = {tag: float(pred[idx]) for tag, idx in self.tag_to_idx.items() if pred[idx] >= self.threshold}
-            return TaggerResult(tags=self._categorize_tag_scores(tag_scores))
+    def postprocess(self, prediction: "np.ndarray") -> TaggerResult:
+        import numpy as np
+
+        try:
+            # 全タグのスコアをまとめて取り出し、閾値以上のタグのみをPythonオブジェクトに変換する
+            scores = prediction[self._tag_indices]
+            selected = np.nonzero(scores >= self.threshold)[0]
+            return TaggerResult(tags=self._categorize_tag_scores(selected, scores))
         except Exception as e:
             raise TaggingError(f"Tagging failed: {e}") from e
+
+    def tag(self, image_binary: bytes) -> TaggerResult:
+        return self.postprocess(self.predict(image_binary))
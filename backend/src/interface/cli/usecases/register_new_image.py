@@ -26,12 +26,24 @@ class RegisterNewImageCLI:
             unit_of_work=unit_of_work,
             tagger=tagger,
             storage=self.storage,
+            use_hash_prefilter=True,
+            use_hash_cache=True,
         )
 
-    def run(self, image_dir: str, n_workers: int = 8, recursive: bool = False) -> None:
+    def run(
+        self,
+        image_dir: str,
+        n_workers: int | None = None,
+        batch_size: int = 16,
+        recursive: bool = False,
+        inference_workers: int = RegisterNewImageUsecase.DEFAULT_INFERENCE_WORKERS,
+    ) -> None:
         """画像ディレクトリ内のすべての画像を登録する"""
-        image_files = self.storage.list_files(image_dir, recursive=recursive)
-        self.usecase.handle(image_files, n_workers=n_workers)
+        # 走査の完了を待たずに、見つかったファイルからチャンク単位で処理を始める
+        image_files = self.storage.iter_files(image_dir, recursive=recursive)
+        self.usecase.handle(
+            image_files, n_workers=n_workers, batch_size=batch_size, inference_workers=inference_workers
+        )
 
 
 if __name__ == "__main__":
@@ -1,3 +1,5 @@
+import logging
+
 from io import BytesIO
 from unittest.mock import MagicMock
 
@@ -8,6 +10,8 @@ from PIL import Image
 from application.service.tagging_result_classifier import TaggedImageEntry, TaggingOutcome
 from application.storage.ports import Storage
 from application.usecases.register_new_image import RegisterNewImageUsecase
+from common.concurrency.write_behind import WriteBehindQueue
+from domain.entities.hash_cache import HashCacheEntry
 from domain.entities.images import ImageEntry, ImageMetadata
 from domain.repositories.unit_of_work import UnitOfWorkProtocol
 from domain.tagger.result import TaggerResult
@@ -31,14 +35,19 @@ def mock_unit_of_work() -> UnitOfWorkProtocol:
 
     # リポジトリのモック
     images_repo = MagicMock()
-    images_repo.find_by_hashes = MagicMock(return_value=[])
+    images_repo.find_existing_hash_values = MagicMock(return_value=set())
     images_repo.add = MagicMock(return_value=[1])
 
     model_tag_repo = MagicMock()
     model_tag_repo.add = MagicMock()
 
-    uow.__getitem__ = MagicMock(side_effect=lambda key: {"images": images_repo, "model_tag": model_tag_repo}[key])
+    hash_cache_repo = MagicMock()
+    hash_cache_repo.find_by_file_locations = MagicMock(return_value=[])
+
+    repos = {"images": images_repo, "model_tag": model_tag_repo, "hash_cache": hash_cache_repo}
+    uow.__getitem__ = MagicMock(side_effect=lambda key: repos[key])
     uow.subset = MagicMock(return_value=uow)
+    uow.for_thread = MagicMock(return_value=uow)
 
     return uow
 
@@ -55,6 +64,7 @@ def mock_storage() -> Storage:
 
     storage.read_binary = MagicMock(return_value=image_bytes.getvalue())
     storage.get_size = MagicMock(return_value=1024 * 1024)  # 1MB
+    storage.stat = MagicMock(return_value=(1024 * 1024, 1700000000.0))
     storage.get_file_extension = MagicMock(return_value="jpg")
     return storage
 
@@ -165,11 +175,9 @@ def assert_metadata_extraction_call_count(storage: Storage, expected_count: int)
     """メタデータ抽出が呼ばれたかを検証するヘルパー関数"""
     if expected_count == 0:
         storage.read_binary.assert_not_called()
-        storage.get_size.assert_not_called()
         storage.get_file_extension.assert_not_called()
     else:
         assert storage.read_binary.call_count == expected_count
-        assert storage.get_size.call_count == expected_count
         assert storage.get_file_extension.call_count == expected_count
 
 
@@ -190,6 +198,12 @@ class TestRegisterNewImageUsecaseValid:
         - 1件の画像を登録する: test_handle_one_image
         - 複数件の画像を登録する: test_handle_many_images
         - 空の画像ファイルリストが入力される: test_empty_image_files_input
+        - 空のイテレータが入力される: test_empty_image_files_iterator_input
+        - ハッシュのプレフィルタを使って画像を登録する: test_handle_with_hash_prefilter
+        - 複数件の画像をバッチ推論で登録する: test_handle_many_images_in_batches
+        - バッチ推論はチャンク全体の前処理を待たずに始まる: test_predict_batch_before_all_preprocessed
+        - 推論結果はチャンク全体の推論を待たずに後処理される: test_postprocess_before_all_predicted
+        - ハッシュのキャッシュで変更のない登録済みファイルを読み込まない: test_handle_with_hash_cache
         - タグ付け結果に異常ケースが含まれていた場合の処理スキップ: test_tagging_result_with_abnormal_cases
             - タグ付け結果が空（すべてのタグ付け結果が閾値を下回った場合）
             - タグ付けが失敗した場合
@@ -212,7 +226,8 @@ class TestRegisterNewImageUsecaseValid:
         )
 
         # タガーのモック設定
-        mock_tagger.tag = MagicMock(return_value=tagger_result)
+        mock_tagger.predict = MagicMock()
+        mock_tagger.postprocess = MagicMock(return_value=tagger_result)
 
         # リポジトリのモック設定
         images_repo = mock_unit_of_work["images"]
@@ -226,10 +241,11 @@ class TestRegisterNewImageUsecaseValid:
         assert_metadata_extraction_call_count(mock_storage, 1)
 
         # 2. 重複チェックが呼ばれたか
-        assert images_repo.find_by_hashes.called
+        assert images_repo.find_existing_hash_values.called
 
         # 3. タグ付けが呼ばれたか
-        assert mock_tagger.tag.called
+        assert mock_tagger.predict.called
+        assert mock_tagger.postprocess.called
 
         # 4.データベースへの永続化が呼ばれたか
         assert_add_call_count(images_repo, 1)
@@ -255,7 +271,8 @@ class TestRegisterNewImageUsecaseValid:
         )
 
         # タガーのモック設定（複数の結果を返す）
-        mock_tagger.tag = MagicMock(side_effect=tagger_results)
+        mock_tagger.predict = MagicMock()
+        mock_tagger.postprocess = MagicMock(side_effect=tagger_results)
 
         # リポジトリのモック設定（複数のIDを返す）
         images_repo = mock_unit_of_work["images"]
@@ -270,7 +287,8 @@ class TestRegisterNewImageUsecaseValid:
         assert_metadata_extraction_call_count(mock_storage, 3)
 
         # 2. タグ付けが呼ばれたか（3回）
-        assert mock_tagger.tag.call_count == 3
+        assert mock_tagger.predict.call_count == 3
+        assert mock_tagger.postprocess.call_count == 3
 
         # 3. データベースへの永続化が呼ばれたか
         assert_add_call_count(images_repo, 3)
@@ -304,13 +322,243 @@ class TestRegisterNewImageUsecaseValid:
         # 何も呼ばれない
         assert_metadata_extraction_call_count(mock_storage, 0)
 
-        assert not mock_tagger.tag.called
+        assert not mock_tagger.predict.called
 
         assert_add_call_count(images_repo, 0)
         assert_add_call_count(model_tag_repo, 0)
 
         assert not mock_unit_of_work.__exit__.called
 
+    def test_empty_image_files_iterator_input(
+        self,
+        caplog: pytest.LogCaptureFixture,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """空のイテレータが入力される"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+        )
+
+        # 実行
+        with caplog.at_level(logging.WARNING):
+            usecase.handle(iter([]), n_workers=1)
+
+        # 検証
+        # 1. 入力がないことが警告される
+        assert "no input files" in caplog.messages
+
+        # 2. 何も呼ばれない
+        assert_metadata_extraction_call_count(mock_storage, 0)
+        assert not mock_tagger.predict.called
+        assert not mock_unit_of_work.__exit__.called
+
+    def test_handle_with_hash_prefilter(
+        self,
+        image_files_one: list[str],
+        tagger_result: TaggerResult,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """ハッシュのプレフィルタを使って画像を登録する"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+            use_hash_prefilter=True,
+        )
+
+        # タガーのモック設定
+        mock_tagger.predict = MagicMock()
+        mock_tagger.postprocess = MagicMock(return_value=tagger_result)
+
+        # リポジトリのモック設定（登録済みの画像なし）
+        images_repo = mock_unit_of_work["images"]
+        images_repo.list_hash_prefixes = MagicMock(return_value=[])
+        model_tag_repo = mock_unit_of_work["model_tag"]
+
+        # 実行
+        usecase.handle(image_files_one, n_workers=1)
+
+        # 検証
+        # 1. プレフィルタで未登録と確定するため、重複チェックの問い合わせは行われない
+        images_repo.list_hash_prefixes.assert_called_once()
+        images_repo.find_existing_hash_values.assert_not_called()
+
+        # 2. データベースへの永続化が呼ばれたか
+        assert_add_call_count(images_repo, 1)
+        assert_add_call_count(model_tag_repo, 1)
+
+    def test_handle_many_images_in_batches(
+        self,
+        image_files_many: list[str],
+        tagger_results: list[TaggerResult],
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """複数件の画像をバッチ推論で登録する"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+        )
+
+        # タガーのモック設定（入力と同じ件数の推論結果を返す）
+        mock_tagger.preprocess = MagicMock()
+        mock_tagger.predict_batch = MagicMock(side_effect=lambda inputs: [MagicMock() for _ in inputs])
+        mock_tagger.postprocess = MagicMock(side_effect=tagger_results)
+
+        # リポジトリのモック設定（複数のIDを返す）
+        images_repo = mock_unit_of_work["images"]
+        images_repo.add.return_value = [1, 2, 3]
+        model_tag_repo = mock_unit_of_work["model_tag"]
+
+        # 実行
+        usecase.handle(image_files_many, n_workers=2, batch_size=2)
+
+        # 検証
+        # 1. 前処理は画像ごと、推論はバッチごとに呼ばれたか
+        assert mock_tagger.preprocess.call_count == 3
+        assert [len(c.args[0]) for c in mock_tagger.predict_batch.call_args_list] == [2, 1]
+        assert mock_tagger.postprocess.call_count == 3
+
+        # 2. データベースへの永続化が呼ばれたか
+        assert_add_call_count(images_repo, 3)
+        assert_add_call_count(model_tag_repo, 3)
+
+    def test_predict_batch_before_all_preprocessed(
+        self,
+        tagger_result: TaggerResult,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """バッチ推論はチャンク全体の前処理を待たずに始まる"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+        )
+        image_files = [f"tests/data/images/test{i}.jpg" for i in range(8)]
+
+        # タガーのモック設定（推論時点で前処理済みの件数を記録する）
+        preprocessed_counts: list[int] = []
+        mock_tagger.preprocess = MagicMock()
+
+        def predict_batch(inputs: list) -> list:
+            preprocessed_counts.append(mock_tagger.preprocess.call_count)
+            return [MagicMock() for _ in inputs]
+
+        mock_tagger.predict_batch = MagicMock(side_effect=predict_batch)
+        mock_tagger.postprocess = MagicMock(return_value=tagger_result)
+        mock_unit_of_work["images"].add.return_value = list(range(8))
+
+        # 実行
+        usecase.handle(image_files, n_workers=2, batch_size=2)
+
+        # 検証
+        # 1. 最初の推論はチャンク内のすべての画像の前処理が終わる前に行われる
+        assert preprocessed_counts[0] < len(image_files)
+        assert mock_tagger.predict_batch.call_count == 4
+
+        # 2. すべての画像が後処理される
+        assert mock_tagger.postprocess.call_count == len(image_files)
+
+    def test_postprocess_before_all_predicted(
+        self,
+        tagger_result: TaggerResult,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """推論結果はチャンク全体の推論を待たずに後処理される"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+        )
+        image_files = [f"tests/data/images/test{i}.jpg" for i in range(8)]
+
+        # タガーのモック設定（後処理時点で推論済みの件数を記録する）
+        predicted_counts: list[int] = []
+        mock_tagger.predict = MagicMock()
+
+        def postprocess(_: object) -> TaggerResult:
+            predicted_counts.append(mock_tagger.predict.call_count)
+            return tagger_result
+
+        mock_tagger.postprocess = MagicMock(side_effect=postprocess)
+        mock_unit_of_work["images"].add.return_value = list(range(8))
+
+        # 実行
+        usecase.handle(image_files, n_workers=1, inference_workers=1)
+
+        # 検証
+        # 1. 最初の後処理はチャンク内のすべての画像の推論が終わる前に行われる
+        assert predicted_counts[0] < len(image_files)
+
+        # 2. すべての画像が後処理される
+        assert mock_tagger.postprocess.call_count == len(image_files)
+
+    def test_handle_with_hash_cache(
+        self,
+        image_files_many: list[str],
+        tagger_result: TaggerResult,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """ハッシュのキャッシュで変更のない登録済みファイルを読み込まない"""
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+            use_hash_cache=True,
+        )
+
+        # タガーのモック設定
+        mock_tagger.predict = MagicMock()
+        mock_tagger.postprocess = MagicMock(return_value=tagger_result)
+
+        # リポジトリのモック設定
+        # 1件目: キャッシュあり・登録済み, 2件目: キャッシュあり・更新日時が変わっている, 3件目: キャッシュなし
+        registered_hash = ImageHash("a" * 64)
+        hash_cache_repo = mock_unit_of_work["hash_cache"]
+        hash_cache_repo.find_by_file_locations.return_value = [
+            HashCacheEntry(FileLocation(image_files_many[0]), 1024 * 1024, 1700000000.0, registered_hash),
+            HashCacheEntry(FileLocation(image_files_many[1]), 1024 * 1024, 1600000000.0, ImageHash("b" * 64)),
+        ]
+        images_repo = mock_unit_of_work["images"]
+        images_repo.find_existing_hash_values.side_effect = lambda hashes: {
+            h.value for h in hashes if h == registered_hash
+        }
+        images_repo.add.return_value = [1, 2]
+
+        # 実行
+        usecase.handle(image_files_many, n_workers=1)
+
+        # 検証
+        # 1. ファイルごとに1回だけサイズと更新日時を取得し、キャッシュから登録済みと確定したファイルは読み込まれない
+        assert mock_storage.stat.call_count == len(image_files_many)
+        read_files = {c.args[0] for c in mock_storage.read_binary.call_args_list}
+        assert read_files == set(image_files_many[1:])
+
+        # 2. 読み込んだファイルのハッシュがキャッシュに保存される
+        hash_cache_repo.upsert.assert_called_once()
+        upserted = hash_cache_repo.upsert.call_args[0][0]
+        assert {entry.file_location.value for entry in upserted} == set(image_files_many[1:])
+
     @pytest.mark.parametrize(
         "outcome, expected_add_count",
         [
@@ -354,7 +602,7 @@ class TestRegisterNewImageUsecaseValid:
         )
 
         # タガーのモック設定
-        mock_tagger.tag = MagicMock()
+        mock_tagger.predict = MagicMock()
 
         # リポジトリのモック設定
         images_repo = mock_unit_of_work["images"]
@@ -383,6 +631,7 @@ class TestRegisterNewImageUsecaseInvalid:
 
     テストケース:
         - サポートされていないファイル形式の画像が入力される: test_unsupported_file_type_input
+        - 永続化に失敗した場合は以降のチャンクを処理しない: test_stop_after_persist_error
     """
 
     def test_unsupported_file_type_input(
@@ -429,3 +678,57 @@ class TestRegisterNewImageUsecaseInvalid:
 
         # 3. コミットが呼ばれたか
         mock_unit_of_work.__exit__.assert_not_called()
+
+    def test_stop_after_persist_error(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        image_files_many: list[str],
+        tagger_result: TaggerResult,
+        mock_unit_of_work: UnitOfWorkProtocol,
+        mock_storage: Storage,
+        mock_tagger: Tagger,
+    ) -> None:
+        """永続化に失敗した場合は以降のチャンクを処理しない"""
+        # 書き込みの完了を待ってから次のチャンクへ進むようにし、失敗の検知を確定させる
+        original_put = WriteBehindQueue.put
+
+        def put_and_join(self: WriteBehindQueue, item: object) -> None:
+            original_put(self, item)
+            self.join()
+
+        monkeypatch.setattr(WriteBehindQueue, "put", put_and_join)
+
+        # セットアップ
+        usecase = RegisterNewImageUsecase(
+            unit_of_work=mock_unit_of_work,
+            tagger=mock_tagger,
+            storage=mock_storage,
+        )
+
+        # ファイルごとに異なる画像にし、重複チェックで除外されないようにする
+        def read_binary(image_file: str) -> bytes:
+            image_bytes = BytesIO()
+            Image.new("RGB", (64, 64), color=(image_files_many.index(image_file), 0, 0)).save(image_bytes, format="PNG")
+            return image_bytes.getvalue()
+
+        mock_storage.read_binary = MagicMock(side_effect=read_binary)
+
+        # タガーのモック設定
+        mock_tagger.predict = MagicMock()
+        mock_tagger.postprocess = MagicMock(return_value=tagger_result)
+
+        # リポジトリのモック設定（永続化に失敗する）
+        images_repo = mock_unit_of_work["images"]
+        images_repo.add.side_effect = RuntimeError("write failed")
+
+        # 実行
+        with pytest.raises(RuntimeError, match="write failed"):
+            usecase.handle(image_files_many, n_workers=1, chunk_size=1)
+
+        # 検証
+        # 1. 失敗したチャンクより後のチャンクはタグ付けされない
+        assert mock_tagger.predict.call_count == 1
+        images_repo.add.assert_called_once()
+
+        # 2. 書き込みスレッド用のUnit of Workが解放される
+        mock_unit_of_work.close.assert_called_once()
@@ -1,8 +1,10 @@
 """execute_parallel関数のテストモジュール"""
 
-import time
+import os
 
-from unittest.mock import MagicMock, patch
+from collections.abc import Iterator
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -16,26 +18,22 @@ from common.concurrency import parallel
 
 def simple_task(n: int) -> int:
     """シンプルなタスク: 数値を2倍にして返す"""
-    time.sleep(0.01)  # 処理時間をシミュレート
     return n * 2
 
 
 def process_item(item_id: int, prefix: str = "", suffix: str = "", multiplier: int = 1) -> str:
     """アイテムを処理する関数（argsとkwargsの両方を使用）"""
-    time.sleep(0.01)
     value = item_id * multiplier
     return f"{prefix}{value}{suffix}"
 
 
 def calculate_sum(a: int, b: int, c: int = 0) -> int:
     """3つの数値の合計を計算（argsとkwargsの組み合わせ）"""
-    time.sleep(0.01)
     return a + b + c
 
 
 def task_with_error(n: int) -> int:
     """エラーが発生する可能性があるタスク"""
-    time.sleep(0.01)
     if n == 5:
         raise ValueError(f"Error occurred for n={n}")
     return n * 10
@@ -43,13 +41,11 @@ def task_with_error(n: int) -> int:
 
 def no_args_task() -> str:
     """引数なしのタスク"""
-    time.sleep(0.01)
     return "completed"
 
 
 def process_file(file_path: str, output_dir: str = "/tmp", encoding: str = "utf-8") -> dict:
     """ファイル処理関数（kwargsのみで使用）"""
-    time.sleep(0.01)
     return {
         "file": file_path,
         "output": f"{output_dir}/output.txt",
@@ -59,17 +55,38 @@ def process_file(file_path: str, output_dir: str = "/tmp", encoding: str = "utf-
 
 def mixed_task(n: int) -> int:
     """成功とエラーが混在するタスク"""
-    time.sleep(0.01)
     if n % 3 == 0:
         raise ValueError(f"Error for n={n}")
     return n * 2
 
 
+def crash_task(n: int) -> int:
+    """n=2の場合にワーカープロセスを異常終了させるタスク"""
+    if n == 2:
+        os._exit(1)
+    return n * 2
+
+
 # ----------------------------
 # Test data
 # ----------------------------
 
 
+@pytest.fixture(scope="module")
+def process_pool() -> Iterator[ProcessPoolExecutor]:
+    """PROCESSのテストで共有するプロセスプール(ワーカーの起動はモジュールで1回のみ)"""
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture
+def mock_tqdm(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """進捗バーを差し替えたモック(渡されたイテレータをそのまま返す)"""
+    mock = MagicMock(side_effect=lambda iterable, **_: iterable)
+    monkeypatch.setattr(parallel, "tqdm", mock)
+    return mock
+
+
 @pytest.fixture
 def args_list_small() -> list[tuple[int, ...]]:
     """小さなargs_listのテストデータ"""
@@ -104,6 +121,8 @@ class TestExecuteParallelValid:
         - 引数なしのタスク: test_no_args_task
         - 空のリストの場合: test_empty_list
         - ProcessPoolExecutorを使用する場合: test_process_strategy
+        - ProcessPoolExecutorでタスクをまとめて渡す場合: test_process_strategy_chunk_size
+        - 作成済みのExecutorを繰り返し使用する場合: test_reuse_executor
         - 結果の順序が入力の順序と一致する: test_result_order
         - 大量のタスクを処理する場合: test_large_number_of_tasks
         - 単一ワーカーの場合: test_single_worker
@@ -111,6 +130,9 @@ class TestExecuteParallelValid:
         - カスタム説明文の設定: test_custom_description
         - args_listのみでkwargs_listがNoneの場合: test_args_list_only_with_none_kwargs
         - kwargs_listのみでargs_listがNoneの場合: test_kwargs_list_only_with_none_args
+        - n_workersを省略した場合: test_default_n_workers
+        - 結果を1件ずつ取得する場合: test_iter_execute
+        - 先行して実行するタスク数を制限する場合: test_iter_execute_max_pending
     """
 
     def test_args_only(
@@ -232,6 +254,66 @@ class TestExecuteParallelValid:
         assert all(isinstance(r, int) for r in results)
         assert results == [2, 4, 6]  # simple_taskは n * 2 を返す
 
+    def test_process_strategy_chunk_size(self, process_pool: ProcessPoolExecutor) -> None:
+        """ProcessPoolExecutorでタスクをまとめて渡す場合のテスト"""
+        results = parallel.execute(
+            func=task_with_error,
+            args_list=[(i,) for i in range(10)],
+            executor=process_pool,
+            chunk_size=4,
+            show_progress=False,
+        )
+
+        # 同じチャンク内でエラーが発生しても、他のタスクの結果は入力の順番で返ってくる
+        assert isinstance(results[5], ValueError)
+        assert [r for i, r in enumerate(results) if i != 5] == [i * 10 for i in range(10) if i != 5]
+
+    def test_reuse_executor(self, process_pool: ProcessPoolExecutor) -> None:
+        """作成済みのExecutorを繰り返し使用する場合のテスト"""
+        for _ in range(2):
+            results = parallel.execute(
+                func=simple_task,
+                args_list=[(i,) for i in range(5)],
+                executor=process_pool,
+                show_progress=False,
+            )
+
+            assert results == [0, 2, 4, 6, 8]
+
+    def test_iter_execute(self) -> None:
+        """結果を1件ずつ取得する場合のテスト"""
+        results = parallel.iter_execute(
+            func=task_with_error,
+            args_list=[(i,) for i in range(10)],
+            n_workers=2,
+            show_progress=False,
+        )
+
+        results = list(results)
+        assert [r for i, r in enumerate(results) if i != 5] == [i * 10 for i in range(10) if i != 5]
+        assert isinstance(results[5], ValueError)
+
+    def test_iter_execute_max_pending(self) -> None:
+        """先行して実行するタスク数を制限する場合のテスト"""
+        started: list[int] = []
+
+        def record_task(n: int) -> int:
+            started.append(n)
+            return n * 2
+
+        results = parallel.iter_execute(
+            func=record_task,
+            args_list=[(i,) for i in range(10)],
+            n_workers=2,
+            max_pending=2,
+            show_progress=False,
+        )
+
+        # 1件目の結果を取得した時点では、max_pending件と取り出し後に補充した1件までしか開始されない
+        assert next(results) == 0
+        assert len(started) <= 3
+        assert list(results) == [i * 2 for i in range(1, 10)]
+
     def test_result_order(self) -> None:
         """結果の順序が入力の順序と一致することを確認"""
         results = parallel.execute(
@@ -278,12 +360,8 @@ class TestExecuteParallelValid:
         assert len(results) == 5
         assert all(not isinstance(r, Exception) for r in results)
 
-    @patch("common.concurrency.parallel.tqdm")
     def test_show_progress_true(self, mock_tqdm: MagicMock) -> None:
         """進捗バーが表示される場合のテスト"""
-        mock_tqdm.return_value.__enter__ = MagicMock(return_value=iter([]))
-        mock_tqdm.return_value.__exit__ = MagicMock(return_value=False)
-
         results = parallel.execute(
             func=simple_task,
             args_list=[(i,) for i in range(3)],
@@ -295,7 +373,8 @@ class TestExecuteParallelValid:
 
         # tqdmが呼ばれたことを確認
         mock_tqdm.assert_called_once()
-        assert len(results) == 3
+        assert mock_tqdm.call_args.kwargs["total"] == 3
+        assert results == [0, 2, 4]
 
     def test_show_progress_false(self) -> None:
         """進捗バーが表示されない場合のテスト"""
@@ -310,13 +389,9 @@ class TestExecuteParallelValid:
         assert len(results) == 3
         assert all(not isinstance(r, Exception) for r in results)
 
-    @patch("common.concurrency.parallel.tqdm")
     def test_custom_description(self, mock_tqdm: MagicMock) -> None:
         """カスタム説明文が設定される場合のテスト"""
-        mock_tqdm.return_value.__enter__ = MagicMock(return_value=iter([]))
-        mock_tqdm.return_value.__exit__ = MagicMock(return_value=False)
-
-        parallel.execute(
+        results = parallel.execute(
             func=simple_task,
             args_list=[(i,) for i in range(3)],
             n_workers=2,
@@ -326,11 +401,9 @@ class TestExecuteParallelValid:
         )
 
         # tqdmがカスタム説明文で呼ばれたことを確認
-        call_args = mock_tqdm.call_args
-        assert call_args is not None
-        # call_argsは(args, kwargs)のタプル
-        _, kwargs = call_args
-        assert kwargs["desc"] == "Custom description"
+        mock_tqdm.assert_called_once()
+        assert mock_tqdm.call_args.kwargs["desc"] == "Custom description"
+        assert results == [0, 2, 4]
 
     def test_args_list_only_with_none_kwargs(self) -> None:
         """args_listのみでkwargs_listがNoneの場合のテスト"""
@@ -365,6 +438,18 @@ class TestExecuteParallelValid:
         assert all(not isinstance(r, Exception) for r in results)
         assert all(isinstance(r, dict) for r in results)
 
+    def test_default_n_workers(self) -> None:
+        """n_workersを省略した場合のテスト"""
+        assert 1 <= parallel.default_n_workers() <= 32
+
+        results = parallel.execute(
+            func=simple_task,
+            args_list=[(i,) for i in range(5)],
+            show_progress=False,
+        )
+
+        assert results == [0, 2, 4, 6, 8]
+
 
 class TestExecuteParallelInvalid:
     """異常系のテスト
@@ -372,9 +457,12 @@ class TestExecuteParallelInvalid:
     テストケース:
         - args_listとkwargs_listの両方がNoneの場合: test_empty_args_and_kwargs
         - args_listとkwargs_listの長さが異なる場合: test_different_length_args_and_kwargs
+        - chunk_sizeが1未満の場合: test_invalid_chunk_size
         - エラーハンドリング（raise_on_error=False）: test_error_handling_false
         - エラーハンドリング（raise_on_error=True）: test_error_handling_raise
         - 成功とエラーが混在する場合: test_mixed_success_and_error
+        - ワーカープロセスが異常終了した場合（raise_on_error=False）: test_broken_pool
+        - ワーカープロセスが異常終了した場合（raise_on_error=True）: test_broken_pool_raise
     """
 
     def test_empty_args_and_kwargs(self) -> None:
@@ -397,6 +485,16 @@ class TestExecuteParallelInvalid:
                 n_workers=1,
             )
 
+    def test_invalid_chunk_size(self) -> None:
+        """chunk_sizeが1未満の場合のテスト"""
+        with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+            parallel.execute(
+                func=simple_task,
+                args_list=[(1,)],
+                n_workers=1,
+                chunk_size=0,
+            )
+
     def test_error_handling(self) -> None:
         """エラーハンドリングのテスト（raise_on_error=False）"""
         results = parallel.execute(
@@ -446,3 +544,32 @@ class TestExecuteParallelInvalid:
             else:
                 assert not isinstance(result, Exception)
                 assert result == i * 2
+
+    def test_broken_pool(self) -> None:
+        """ワーカープロセスが異常終了した場合のテスト（raise_on_error=False）"""
+        # 共有のプロセスプールを壊さないよう、このテスト専用のプロセスプールを使う
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results = parallel.execute(
+                func=crash_task,
+                args_list=[(i,) for i in range(5)],
+                executor=pool,
+                show_progress=False,
+                raise_on_error=False,
+            )
+
+        assert len(results) == 5
+        # 異常終了したタスク以降は結果を取得できず、それぞれのタスクの失敗になる
+        assert all(isinstance(r, BrokenExecutor) for r in results[2:])
+        # それより前のタスクは成功しているか、プールの破損による失敗になる
+        assert all(r == i * 2 or isinstance(r, BrokenExecutor) for i, r in enumerate(results[:2]))
+
+    def test_broken_pool_raise(self) -> None:
+        """ワーカープロセスが異常終了した場合のテスト（raise_on_error=True）"""
+        with ProcessPoolExecutor(max_workers=1) as pool, pytest.raises(BrokenExecutor):
+            parallel.execute(
+                func=crash_task,
+                args_list=[(i,) for i in range(5)],
+                executor=pool,
+                show_progress=False,
+                raise_on_error=True,
+            )
@@ -0,0 +1,114 @@
+"""WriteBehindQueueのテストモジュール"""
+
+import threading
+
+import pytest
+
+from common.concurrency.write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueueValid:
+    """正常系のテスト
+
+    テストケース:
+        - 投入した順番にすべて書き込まれる: test_consume_in_order
+        - 書き込みが呼び出し元とは別スレッドで行われる: test_consume_in_writer_thread
+        - closeを複数回呼び出しても問題ない: test_close_twice
+    """
+
+    def test_consume_in_order(self) -> None:
+        """投入した順番にすべて書き込まれる"""
+        consumed: list[int] = []
+
+        with WriteBehindQueue(consumer=consumed.append, maxsize=2) as writer:
+            for i in range(10):
+                writer.put(i)
+
+        assert consumed == list(range(10))
+
+    def test_consume_in_writer_thread(self) -> None:
+        """書き込みが呼び出し元とは別スレッドで行われる"""
+        thread_ids: list[int] = []
+
+        with WriteBehindQueue(consumer=lambda _: thread_ids.append(threading.get_ident())) as writer:
+            writer.put(1)
+
+        assert thread_ids
+        assert thread_ids[0] != threading.get_ident()
+
+    def test_close_twice(self) -> None:
+        """closeを複数回呼び出しても問題ない"""
+        consumed: list[int] = []
+        writer = WriteBehindQueue(consumer=consumed.append)
+        writer.put(1)
+
+        writer.close()
+        writer.close()
+
+        assert consumed == [1]
+
+
+class TestWriteBehindQueueInvalid:
+    """異常系のテスト
+
+    テストケース:
+        - 書き込みで発生した例外がcloseで送出される: test_consumer_error_raised_on_close
+        - 書き込みで例外が発生した後のアイテムは書き込まれない: test_skip_items_after_error
+        - 書き込みで発生した例外をraise_if_failedで確認できる: test_raise_if_failed
+        - close後にputした場合: test_put_after_close
+    """
+
+    def test_consumer_error_raised_on_close(self) -> None:
+        """書き込みで発生した例外がcloseで送出される"""
+
+        def failing_consumer(_: int) -> None:
+            raise ValueError("write failed")
+
+        writer = WriteBehindQueue(consumer=failing_consumer)
+        writer.put(1)
+
+        with pytest.raises(ValueError, match="write failed"):
+            writer.close()
+
+    def test_skip_items_after_error(self) -> None:
+        """書き込みで例外が発生した後のアイテムは書き込まれない"""
+        consumed: list[int] = []
+
+        def consumer(item: int) -> None:
+            if item == 1:
+                raise ValueError("write failed")
+            consumed.append(item)
+
+        with pytest.raises(ValueError, match="write failed"), WriteBehindQueue(consumer=consumer) as writer:
+            for i in range(3):
+                try:
+                    writer.put(i)
+                except ValueError:
+                    break
+
+        assert 0 in consumed
+        assert 2 not in consumed
+
+    def test_raise_if_failed(self) -> None:
+        """書き込みで発生した例外をraise_if_failedで確認できる"""
+
+        def failing_consumer(_: int) -> None:
+            raise ValueError("write failed")
+
+        writer = WriteBehindQueue(consumer=failing_consumer)
+        writer.raise_if_failed()
+        writer.put(1)
+        writer.join()
+
+        with pytest.raises(ValueError, match="write failed"):
+            writer.raise_if_failed()
+        with pytest.raises(ValueError, match="write failed"):
+            writer.close()
+
+    def test_put_after_close(self) -> None:
+        """close後にputした場合"""
+        writer = WriteBehindQueue(consumer=lambda _: None)
+        writer.close()
+
+        with pytest.raises(RuntimeError, match="already closed"):
+            writer.put(1)
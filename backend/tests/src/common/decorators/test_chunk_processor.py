@@ -0,0 +1,76 @@
+"""chunk_processorデコレータのテストモジュール"""
+
+from common.decorators.chunk_processor import ChunkInfo, chunk_processor
+
+
+# ----------------------------
+# Helper functions
+# ----------------------------
+
+
+class Recorder:
+    """チャンクごとの呼び出しを記録する"""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[list[int], ChunkInfo | None]] = []
+
+    @chunk_processor("items", default_chunk_size=3)
+    def process(self, items: list[int], chunk_size: int = 3, chunk_info: ChunkInfo | None = None) -> int:
+        self.calls.append((list(items), chunk_info))
+        return sum(items)
+
+
+class TestChunkProcessorValid:
+    """正常系のテスト
+
+    テストケース:
+        - リストをチャンクに分割して実行する: test_split_list
+        - リストがチャンクサイズ以下の場合は分割しない: test_small_list
+        - イテレータをチャンクに分割して実行する: test_split_iterator
+        - 引数のchunk_sizeが優先される: test_chunk_size_argument
+    """
+
+    def test_split_list(self) -> None:
+        """リストをチャンクに分割して実行する"""
+        recorder = Recorder()
+
+        results = recorder.process(list(range(7)))
+
+        assert results == [3, 12, 6]
+        assert [items for items, _ in recorder.calls] == [[0, 1, 2], [3, 4, 5], [6]]
+        infos = [info for _, info in recorder.calls]
+        assert [info.total_chunks for info in infos] == [3, 3, 3]
+        assert [info.offset for info in infos] == [0, 3, 6]
+        assert [info.is_last for info in infos] == [False, False, True]
+
+    def test_small_list(self) -> None:
+        """リストがチャンクサイズ以下の場合は分割しない"""
+        recorder = Recorder()
+
+        result = recorder.process([1, 2])
+
+        assert result == 3
+        assert recorder.calls == [([1, 2], None)]
+
+    def test_split_iterator(self) -> None:
+        """イテレータをチャンクに分割して実行する"""
+        recorder = Recorder()
+
+        results = recorder.process(iter(range(7)))
+
+        assert results == [3, 12, 6]
+        assert [items for items, _ in recorder.calls] == [[0, 1, 2], [3, 4, 5], [6]]
+        infos = [info for _, info in recorder.calls]
+        assert [info.total_chunks for info in infos] == [None, None, None]
+        assert [info.current_idx for info in infos] == [1, 2, 3]
+        assert [info.offset for info in infos] == [0, 3, 6]
+        assert [info.is_first for info in infos] == [True, False, False]
+        assert [info.is_last for info in infos] == [False, False, True]
+
+    def test_chunk_size_argument(self) -> None:
+        """引数のchunk_sizeが優先される"""
+        recorder = Recorder()
+
+        results = recorder.process(iter(range(4)), chunk_size=2)
+
+        assert results == [1, 5]
@@ -0,0 +1,69 @@
+"""parse_image_sizeのテストモジュール"""
+
+from io import BytesIO
+
+import pytest
+
+from PIL import Image
+
+from common.image.header import parse_image_size
+
+
+WIDTH, HEIGHT = 123, 45
+
+
+def encode_image(image_format: str, **kwargs: object) -> bytes:
+    """指定した形式で画像をエンコードするヘルパー関数"""
+    buf = BytesIO()
+    Image.new("RGB", (WIDTH, HEIGHT), "red").save(buf, image_format, **kwargs)
+    return buf.getvalue()
+
+
+class TestParseImageSizeValid:
+    """正常系のテスト
+
+    テストケース:
+        - 主要な形式のヘッダから画像サイズを取得できる: test_parse_supported_formats
+        - 先頭部分のみのバイナリから画像サイズを取得できる: test_parse_header_only
+    """
+
+    @pytest.mark.parametrize(
+        ("image_format", "kwargs"),
+        [
+            ("PNG", {}),
+            ("JPEG", {}),
+            ("JPEG", {"progressive": True}),
+            ("GIF", {}),
+            ("WEBP", {}),
+            ("WEBP", {"lossless": True}),
+        ],
+    )
+    def test_parse_supported_formats(self, image_format: str, kwargs: dict) -> None:
+        """主要な形式のヘッダから画像サイズを取得できる"""
+        assert parse_image_size(encode_image(image_format, **kwargs)) == (WIDTH, HEIGHT)
+
+    def test_parse_header_only(self) -> None:
+        """先頭部分のみのバイナリから画像サイズを取得できる"""
+        assert parse_image_size(encode_image("PNG")[:32]) == (WIDTH, HEIGHT)
+
+
+class TestParseImageSizeInvalid:
+    """異常系のテスト
+
+    テストケース:
+        - 未対応の形式の場合はNoneを返す: test_unsupported_format
+        - 画像ではないバイナリの場合はNoneを返す: test_not_image
+        - ヘッダが途中で切れている場合はNoneを返す: test_truncated_header
+    """
+
+    def test_unsupported_format(self) -> None:
+        """未対応の形式の場合はNoneを返す"""
+        assert parse_image_size(encode_image("BMP")) is None
+
+    def test_not_image(self) -> None:
+        """画像ではないバイナリの場合はNoneを返す"""
+        assert parse_image_size(b"invalid_image_data") is None
+
+    def test_truncated_header(self) -> None:
+        """ヘッダが途中で切れている場合はNoneを返す"""
+        assert parse_image_size(encode_image("JPEG")[:4]) is None
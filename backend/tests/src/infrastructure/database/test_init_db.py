@@ -0,0 +1,72 @@
+"""initialize_databaseのテストモジュール"""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import duckdb
+import pytest
+
+from application.storage.ports import Storage
+from infrastructure.database.init_db import initialize_database
+
+
+SCHEMA_FILE = Path(__file__).parents[4] / "src" / "infrastructure" / "database" / "schema.sql"
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def mock_storage() -> Storage:
+    """ローカルファイルを読み書きするStorageのモック"""
+    storage = MagicMock(spec=Storage)
+    storage.read_text = MagicMock(side_effect=lambda path: Path(path).read_text(encoding="utf-8"))
+    storage.exists = MagicMock(side_effect=lambda path: Path(path).exists())
+    storage.delete = MagicMock(side_effect=lambda path: Path(path).unlink())
+    return storage
+
+
+def list_tables(db_file: str) -> set[str]:
+    """データベースのテーブル名を取得するヘルパー関数"""
+    with duckdb.connect(database=db_file) as conn:
+        return {row[0] for row in conn.execute("SELECT table_name FROM information_schema.tables").fetchall()}
+
+
+# ----------------------------
+# Tests
+# ----------------------------
+
+
+class TestInitializeDatabaseValid:
+    """正常系のテスト
+
+    テストケース:
+        - 新規にデータベースを作成する: test_initialize
+        - 既存のデータベースに後から追加されたテーブルを作成し、既存のデータは残す: test_migrate_existing_database
+    """
+
+    def test_initialize(self, tmp_path: Path, mock_storage: Storage) -> None:
+        """新規にデータベースを作成する"""
+        db_file = str(tmp_path / "test.duckdb")
+
+        initialize_database(mock_storage, db_file=db_file, schema_file=str(SCHEMA_FILE))
+
+        assert {"images", "hash_cache", "tags_camie_v2"} <= list_tables(db_file)
+
+    def test_migrate_existing_database(self, tmp_path: Path, mock_storage: Storage) -> None:
+        """既存のデータベースに後から追加されたテーブルを作成し、既存のデータは残す"""
+        db_file = str(tmp_path / "test.duckdb")
+        initialize_database(mock_storage, db_file=db_file, schema_file=str(SCHEMA_FILE))
+        # hash_cacheテーブルが追加される前のデータベースを再現する
+        with duckdb.connect(database=db_file) as conn:
+            conn.execute("DROP TABLE hash_cache")
+            conn.execute("INSERT INTO images (file_location, hash) VALUES ('a.jpg', 'a')")
+
+        initialize_database(mock_storage, db_file=db_file, schema_file=str(SCHEMA_FILE))
+
+        assert "hash_cache" in list_tables(db_file)
+        with duckdb.connect(database=db_file) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM images").fetchone()[0] == 1
+        mock_storage.delete.assert_not_called()
@@ -0,0 +1,119 @@
+"""Registry, NestedRegistryのテストモジュール"""
+
+import sys
+
+import pytest
+
+from infrastructure.registry.core import NestedRegistry, Registry
+
+
+# 遅延登録の参照先として、importされていない標準ライブラリのモジュールを使う
+LAZY_MODULE = "graphlib"
+
+
+@pytest.fixture
+def unload_lazy_module() -> None:
+    sys.modules.pop(LAZY_MODULE, None)
+
+
+class TestRegistryValid:
+    """正常系のテスト
+
+    テストケース:
+        - デコレータで登録したクラスを取得できる: test_register
+        - 遅延登録したクラスは参照時にimportされる: test_register_lazy
+        - 遅延登録したクラスで呼び出すとインスタンスを作成できる: test_call_lazy
+    """
+
+    def test_register(self) -> None:
+        """デコレータで登録したクラスを取得できる"""
+        registry = Registry("test")
+
+        @registry.register("foo")
+        class Foo:
+            pass
+
+        assert registry["foo"] is Foo
+
+    def test_register_lazy(self, unload_lazy_module: None) -> None:
+        """遅延登録したクラスは参照時にimportされる"""
+        registry = Registry("test")
+        registry.register_lazy("sorter", LAZY_MODULE, "TopologicalSorter")
+        assert LAZY_MODULE not in sys.modules
+
+        cls = registry["sorter"]
+
+        assert cls is sys.modules[LAZY_MODULE].TopologicalSorter
+        assert registry["sorter"] is cls
+
+    def test_call_lazy(self) -> None:
+        """遅延登録したクラスで呼び出すとインスタンスを作成できる"""
+        registry = Registry("test")
+        registry.register_lazy("sorter", LAZY_MODULE, "TopologicalSorter")
+
+        sorter = registry("sorter", {"b": {"a"}})
+
+        assert list(sorter.static_order()) == ["a", "b"]
+
+
+class TestRegistryInvalid:
+    """異常系のテスト
+
+    テストケース:
+        - 未登録の名前で呼び出すとValueError: test_call_unknown
+    """
+
+    def test_call_unknown(self) -> None:
+        """未登録の名前で呼び出すとValueError"""
+        registry = Registry("test")
+
+        with pytest.raises(ValueError, match="Unknown test"):
+            registry("unknown")
+
+
+class TestNestedRegistryValid:
+    """正常系のテスト
+
+    テストケース:
+        - デコレータで登録したクラスを取得できる: test_register
+        - 遅延登録したクラスは参照時にimportされる: test_register_lazy
+    """
+
+    def test_register(self) -> None:
+        """デコレータで登録したクラスを取得できる"""
+        registry = NestedRegistry("test")
+
+        @registry.register("images", "duckdb")
+        class Foo:
+            pass
+
+        assert registry.get("images", "duckdb") is Foo
+
+    def test_register_lazy(self, unload_lazy_module: None) -> None:
+        """遅延登録したクラスは参照時にimportされる"""
+        registry = NestedRegistry("test")
+        registry.register_lazy("graph", "sorter", LAZY_MODULE, "TopologicalSorter")
+        assert LAZY_MODULE not in sys.modules
+
+        cls = registry.get("graph", "sorter")
+
+        assert cls is sys.modules[LAZY_MODULE].TopologicalSorter
+        assert registry("graph", "sorter") is cls
+
+
+class TestNestedRegistryInvalid:
+    """異常系のテスト
+
+    テストケース:
+        - 未登録のカテゴリ・実装を取得するとValueError: test_get_unknown
+    """
+
+    def test_get_unknown(self) -> None:
+        """未登録のカテゴリ・実装を取得するとValueError"""
+        registry = NestedRegistry("test")
+        registry.register_lazy("graph", "sorter", LAZY_MODULE, "TopologicalSorter")
+
+        with pytest.raises(ValueError, match="Unknown test"):
+            registry.get("graph", "unknown")
+        with pytest.raises(ValueError, match="Unknown test"):
+            registry.get("unknown", "sorter")
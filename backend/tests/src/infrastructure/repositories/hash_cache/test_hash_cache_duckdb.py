@@ -0,0 +1,104 @@
+import duckdb
+import pytest
+
+from domain.entities.hash_cache import HashCacheEntry
+from domain.value_objects.file_location import FileLocation
+from domain.value_objects.image_hash import ImageHash
+from infrastructure.repositories.hash_cache.duckdb import DuckDBHashCacheRepository
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def repository() -> DuckDBHashCacheRepository:
+    repo = DuckDBHashCacheRepository(conn=duckdb.connect(":memory:"), table_name="hash_cache")
+    repo.conn.execute(
+        """
+        CREATE TABLE hash_cache (
+            file_location  TEXT PRIMARY KEY,
+            file_size      BIGINT NOT NULL,
+            mtime          DOUBLE NOT NULL,
+            hash           TEXT NOT NULL
+        );
+        """
+    )
+    return repo
+
+
+# ----------------------------
+# Test data
+# ----------------------------
+
+
+def create_hash_cache_entry(
+    file_path: str,
+    hash_value: str = "a" * 64,
+    file_size: int = 1024 * 1024,
+    mtime: float = 1700000000.123456,
+) -> HashCacheEntry:
+    """HashCacheEntryを作成するヘルパー関数"""
+    return HashCacheEntry(
+        file_location=FileLocation(file_path),
+        file_size=file_size,
+        mtime=mtime,
+        hash=ImageHash(hash_value),
+    )
+
+
+# ----------------------------
+# Test classes
+# ----------------------------
+
+
+class TestDuckDBHashCacheRepositoryValid:
+    """正常系のテスト
+
+    テストケース:
+        - upsert
+            - 複数件のキャッシュを追加する: test_upsert_many
+            - 既存のキャッシュを更新する: test_upsert_existing
+            - 空のリストが入力された場合: test_upsert_empty_list
+        - find_by_file_locations
+            - 存在しないファイルパスを指定した場合: test_find_by_file_locations_nonexistent
+    """
+
+    def test_upsert_many(self, repository: DuckDBHashCacheRepository) -> None:
+        """複数件のキャッシュを追加する"""
+        # 実行
+        entries = [create_hash_cache_entry(f"tests/data/images/test{i}.jpg", hash_value=f"{i:064x}") for i in range(3)]
+        repository.upsert(entries)
+
+        # 検証
+        result = repository.find_by_file_locations([entry.file_location.value for entry in entries])
+        assert sorted(result, key=lambda e: e.file_location.value) == entries
+
+    def test_upsert_existing(self, repository: DuckDBHashCacheRepository) -> None:
+        """既存のキャッシュを更新する"""
+        # セットアップ
+        repository.upsert([create_hash_cache_entry("tests/data/images/test.jpg", hash_value="a" * 64)])
+
+        # 実行
+        updated = create_hash_cache_entry("tests/data/images/test.jpg", hash_value="b" * 64, mtime=1800000000.0)
+        repository.upsert([updated])
+
+        # 検証
+        assert repository.find_by_file_locations(["tests/data/images/test.jpg"]) == [updated]
+
+    def test_upsert_empty_list(self, repository: DuckDBHashCacheRepository) -> None:
+        """空のリストが入力された場合"""
+        # 実行
+        repository.upsert([])
+
+        # 検証
+        assert repository.find_by_file_locations([]) == []
+
+    def test_find_by_file_locations_nonexistent(self, repository: DuckDBHashCacheRepository) -> None:
+        """存在しないファイルパスを指定した場合"""
+        # 実行
+        result = repository.find_by_file_locations(["tests/data/images/nonexistent.jpg"])
+
+        # 検証
+        assert result == []
@@ -1,3 +1,4 @@
+import duckdb
 import pytest
 
 from domain.entities.images import ImageEntry, ImageMetadata
@@ -26,7 +27,7 @@ def db_schema() -> str:
         height         INTEGER,
         file_type      TEXT,
         hash           TEXT NOT NULL UNIQUE,
-        file_size      INTEGER,
+        file_size      BIGINT,
         added_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
@@ -35,7 +36,7 @@ def db_schema() -> str:
 
 @pytest.fixture
 def repository(db_schema: str) -> DuckDBImagesRepository:
-    repo = DuckDBImagesRepository(database_file=":memory:", table_name="images")
+    repo = DuckDBImagesRepository(conn=duckdb.connect(":memory:"), table_name="images")
     repo.conn.execute(db_schema)
     return repo
 
@@ -115,6 +116,7 @@ class TestDuckDBImagesRepositoryValid:
             - 1件の画像を追加する: test_add_one_image
             - 複数件の画像を追加する: test_add_many_images
             - 空のリストが入力された場合: test_add_empty_list
+            - 2GiB以上のファイルサイズの画像を追加する: test_add_large_file_size
         - remove
             - 1件の画像を削除する: test_remove_one_image
             - 複数件の画像を削除する: test_remove_many_images
@@ -125,6 +127,13 @@ class TestDuckDBImagesRepositoryValid:
         - find_by_hashes
             - 存在するハッシュを指定した場合: test_find_by_hashes_existing
             - 存在しないハッシュを指定した場合: test_find_by_hashes_nonexistent
+            - 大量のハッシュを指定した場合: test_find_by_hashes_many
+        - find_existing_hash_values
+            - 登録済みと未登録のハッシュを混ぜて指定した場合: test_find_existing_hash_values
+        - list_hash_values
+            - 登録済みのハッシュをすべて取得する: test_list_hash_values
+        - list_hash_prefixes
+            - 登録済みのハッシュの先頭ビットの値を重複なしで取得する: test_list_hash_prefixes
         - update
             - 1件の画像を更新する: test_update_one_image
             - 複数件の画像を更新する: test_update_many_images
@@ -178,6 +187,20 @@ class TestDuckDBImagesRepositoryValid:
         # 検証
         assert result == []
 
+    def test_add_large_file_size(self, repository: DuckDBImagesRepository) -> None:
+        """2GiB以上のファイルサイズの画像を追加する"""
+        # 準備
+        file_size = 3 * 1024**3
+        image_entry = create_image_entry("tests/data/images/large.tif", file_size=file_size)
+
+        # 実行
+        result = repository.add([image_entry])
+
+        # 検証
+        retrieved = repository.get(result[0])
+        assert retrieved is not None
+        assert retrieved.file_size == file_size
+
     def test_remove_one_image(self, repository: DuckDBImagesRepository, image_entry_one: ImageEntry) -> None:
         """1件の画像を削除する"""
         # セットアップ: 画像を追加
@@ -285,6 +308,63 @@ class TestDuckDBImagesRepositoryValid:
         # 検証
         assert result == []
 
+    def test_find_by_hashes_many(self, repository: DuckDBImagesRepository) -> None:
+        """大量のハッシュを指定した場合"""
+        # セットアップ: 画像を追加
+        entries = [create_image_entry(f"tests/data/images/test{i}.jpg", hash_value=f"{i:064x}") for i in range(1500)]
+        repository.add(entries)
+
+        # 実行: 登録済みのハッシュと未登録のハッシュを混ぜて検索
+        hashes_to_find = [entry.hash for entry in entries[::2]] + [ImageHash(f"{i:064x}") for i in range(2000, 2500)]
+        result = repository.find_by_hashes(hashes_to_find)
+
+        # 検証
+        found_hashes = {str(r.hash) for r in result}
+        expected_hashes = {str(entry.hash) for entry in entries[::2]}
+        assert found_hashes == expected_hashes
+
+    def test_find_existing_hash_values(self, repository: DuckDBImagesRepository) -> None:
+        """登録済みと未登録のハッシュを混ぜて指定した場合"""
+        # セットアップ: 画像を追加
+        entries = [create_image_entry(f"tests/data/images/test{i}.jpg", hash_value=f"{i:064x}") for i in range(10)]
+        repository.add(entries)
+
+        # 実行
+        hashes_to_find = [entry.hash for entry in entries[:5]] + [ImageHash(f"{i:064x}") for i in range(100, 105)]
+        result = repository.find_existing_hash_values(hashes_to_find)
+
+        # 検証
+        assert result == {str(entry.hash) for entry in entries[:5]}
+        assert repository.find_existing_hash_values([]) == set()
+
+    def test_list_hash_values(self, repository: DuckDBImagesRepository, image_entries_many: list[ImageEntry]) -> None:
+        """登録済みのハッシュをすべて取得する"""
+        # 実行: 空のテーブル
+        assert repository.list_hash_values() == []
+
+        # セットアップ: 画像を追加
+        repository.add(image_entries_many)
+
+        # 実行
+        result = repository.list_hash_values()
+
+        # 検証
+        assert sorted(result) == sorted(str(entry.hash) for entry in image_entries_many)
+
+    def test_list_hash_prefixes(self, repository: DuckDBImagesRepository, image_entries_many: list[ImageEntry]) -> None:
+        """登録済みのハッシュの先頭ビットの値を重複なしで取得する"""
+        # 実行: 空のテーブル
+        assert len(repository.list_hash_prefixes(24)) == 0
+
+        # セットアップ: 画像を追加
+        repository.add(image_entries_many)
+
+        # 実行
+        result = repository.list_hash_prefixes(24)
+
+        # 検証
+        assert sorted(result.tolist()) == sorted({int(str(entry.hash)[:6], 16) for entry in image_entries_many})
+
     def test_update_one_image(self, repository: DuckDBImagesRepository, image_entry_one: ImageEntry) -> None:
         """1件の画像を更新する"""
         # セットアップ: 画像を追加
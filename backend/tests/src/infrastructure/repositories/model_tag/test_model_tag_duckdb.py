@@ -0,0 +1,88 @@
+import duckdb
+import pytest
+
+from domain.entities.model_tag import ModelTagEntries, ModelTagEntry
+from infrastructure.repositories.model_tag.duckdb import DuckDBModelTagRepository
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def repository() -> DuckDBModelTagRepository:
+    repo = DuckDBModelTagRepository(conn=duckdb.connect(":memory:"), table_name="tags_camie_v2")
+    repo.conn.execute(
+        """
+        CREATE TABLE tags_camie_v2 (
+            image_id  INTEGER NOT NULL,
+            category  TEXT NOT NULL,
+            tag       TEXT NOT NULL,
+            score     DOUBLE,
+            archived  BOOLEAN DEFAULT FALSE,
+            PRIMARY KEY(image_id, category, tag)
+        );
+        """
+    )
+    return repo
+
+
+# ----------------------------
+# Test data
+# ----------------------------
+
+
+def create_model_tag_entries(image_id: int, n_tags: int = 3) -> ModelTagEntries:
+    """ModelTagEntriesを作成するヘルパー関数"""
+    return ModelTagEntries(
+        entries=[ModelTagEntry(image_id=image_id, category="general", tag=f"tag{i}", score=0.5) for i in range(n_tags)]
+    )
+
+
+# ----------------------------
+# Tests
+# ----------------------------
+
+
+class TestDuckDBModelTagRepositoryValid:
+    """正常系のテスト
+
+    テストケース:
+        - 複数画像のタグを追加して取得: test_add_and_get
+        - 1件の画像のタグを削除: test_remove_all_by_image_id_one
+        - 複数画像のタグをまとめて削除: test_remove_all_by_image_ids_many
+        - 空のリストで削除: test_remove_all_by_image_ids_empty_list
+    """
+
+    def test_add_and_get(self, repository: DuckDBModelTagRepository) -> None:
+        """複数画像のタグを追加して取得"""
+        repository.add([create_model_tag_entries(1), create_model_tag_entries(2, n_tags=2)])
+
+        assert repository.get(1) == create_model_tag_entries(1)
+        assert repository.get(2) == create_model_tag_entries(2, n_tags=2)
+        assert repository.get(3) == ModelTagEntries(entries=[])
+
+    def test_remove_all_by_image_id_one(self, repository: DuckDBModelTagRepository) -> None:
+        """1件の画像のタグを削除"""
+        repository.add([create_model_tag_entries(1), create_model_tag_entries(2)])
+
+        assert repository.remove_all_by_image_id(1) == 3
+        assert repository.get(1) == ModelTagEntries(entries=[])
+        assert repository.count() == 3
+
+    def test_remove_all_by_image_ids_many(self, repository: DuckDBModelTagRepository) -> None:
+        """複数画像のタグをまとめて削除"""
+        repository.add([create_model_tag_entries(image_id) for image_id in range(100)])
+
+        assert repository.remove_all_by_image_ids(list(range(0, 100, 2))) == 150
+        assert repository.count() == 150
+        assert repository.get(0) == ModelTagEntries(entries=[])
+        assert repository.get(1) == create_model_tag_entries(1)
+
+    def test_remove_all_by_image_ids_empty_list(self, repository: DuckDBModelTagRepository) -> None:
+        """空のリストで削除"""
+        repository.add(create_model_tag_entries(1))
+
+        assert repository.remove_all_by_image_ids([]) == 0
+        assert repository.count() == 3
@@ -0,0 +1,253 @@
+"""UnitOfWorkのテストモジュール"""
+
+import threading
+
+from unittest.mock import MagicMock
+
+import duckdb
+import pytest
+
+from domain.entities.hash_cache import HashCacheEntry
+from domain.entities.images import ImageEntry, ImageMetadata
+from domain.exceptions import DuplicateImageError
+from domain.value_objects.file_location import FileLocation
+from domain.value_objects.image_hash import ImageHash
+from domain.value_objects.image_size import ImageSize
+from infrastructure.repositories.hash_cache.duckdb import DuckDBHashCacheRepository
+from infrastructure.repositories.images.duckdb import DuckDBImagesRepository
+from infrastructure.repositories.unit_of_work import UnitOfWork
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+@pytest.fixture
+def unit_of_work() -> UnitOfWork:
+    """同じ接続を共有するimages, hash_cacheリポジトリのUnit of Work"""
+    conn = duckdb.connect(":memory:")
+    conn.execute(
+        """
+        CREATE SEQUENCE IF NOT EXISTS image_id_seq START 1 INCREMENT 1;
+
+        CREATE TABLE IF NOT EXISTS images (
+            image_id       INTEGER PRIMARY KEY DEFAULT NEXTVAL('image_id_seq'),
+            file_location  TEXT NOT NULL,
+            width          INTEGER,
+            height         INTEGER,
+            file_type      TEXT,
+            hash           TEXT NOT NULL UNIQUE,
+            file_size      BIGINT,
+            added_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at     TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS hash_cache (
+            file_location  TEXT PRIMARY KEY,
+            file_size      BIGINT NOT NULL,
+            mtime          DOUBLE NOT NULL,
+            hash           TEXT NOT NULL
+        );
+        """
+    )
+    return UnitOfWork(
+        {
+            "images": DuckDBImagesRepository(conn=conn, table_name="images"),
+            "hash_cache": DuckDBHashCacheRepository(conn=conn, table_name="hash_cache"),
+        }
+    )
+
+
+# ----------------------------
+# Test data
+# ----------------------------
+
+
+def create_image_entry(file_path: str, hash_value: str) -> ImageEntry:
+    """ImageEntryを作成するヘルパー関数"""
+    metadata = ImageMetadata(
+        file_location=FileLocation(file_path),
+        hash=ImageHash(hash_value),
+        size=ImageSize(width=100, height=100),
+        file_type="jpg",
+        file_size=1024,
+    )
+    return ImageEntry.from_metadata(metadata)
+
+
+def create_hash_cache_entry(file_path: str, hash_value: str) -> HashCacheEntry:
+    """HashCacheEntryを作成するヘルパー関数"""
+    return HashCacheEntry(
+        file_location=FileLocation(file_path),
+        file_size=1024,
+        mtime=0.0,
+        hash=ImageHash(hash_value),
+    )
+
+
+def count_rows(unit_of_work: UnitOfWork, table_name: str) -> int:
+    """テーブルの行数を取得するヘルパー関数"""
+    return unit_of_work["images"].conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+
+
+# ----------------------------
+# Tests
+# ----------------------------
+
+
+class TestUnitOfWorkValid:
+    """正常系のテスト
+
+    テストケース:
+        - ブロック内の複数リポジトリへの書き込みがまとめてコミットされる: test_commit
+        - Unit of Workを繰り返し使用できる: test_reuse
+        - 同じ接続を共有するリポジトリは接続ごとに1回だけコミットする: test_commit_once_per_connection
+        - 入れ子のUnit of Workは外側のトランザクションに参加し、外側の書き込みが残る: test_nested
+        - 入れ子のUnit of Workはトランザクションを開始・コミットしない: test_nested_does_not_begin
+        - 別スレッド用のUnit of Workは専用の接続で書き込む: test_for_thread
+        - 無関係なUnit of Workとはトランザクションの状態を共有しない: test_independent_units_of_work
+    """
+
+    def test_commit(self, unit_of_work: UnitOfWork) -> None:
+        """ブロック内の複数リポジトリへの書き込みがまとめてコミットされる"""
+        with unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+            unit_of_work["hash_cache"].upsert([create_hash_cache_entry("a.jpg", "a" * 64)])
+
+        assert count_rows(unit_of_work, "images") == 1
+        assert count_rows(unit_of_work, "hash_cache") == 1
+
+    def test_reuse(self, unit_of_work: UnitOfWork) -> None:
+        """Unit of Workを繰り返し使用できる"""
+        for i, hash_value in enumerate(["a" * 64, "b" * 64]):
+            with unit_of_work:
+                unit_of_work["images"].add([create_image_entry(f"{i}.jpg", hash_value)])
+
+        assert count_rows(unit_of_work, "images") == 2
+
+    def test_commit_once_per_connection(self) -> None:
+        """同じ接続を共有するリポジトリは接続ごとに1回だけコミットする"""
+        shared_conn, other_conn = MagicMock(), MagicMock()
+        repos = {
+            "images": MagicMock(conn=shared_conn),
+            "model_tag": MagicMock(conn=shared_conn),
+            "hash_cache": MagicMock(conn=other_conn),
+        }
+
+        with UnitOfWork(repos):
+            pass
+
+        assert repos["images"].begin.call_count + repos["model_tag"].begin.call_count == 1
+        assert repos["images"].commit.call_count + repos["model_tag"].commit.call_count == 1
+        assert repos["hash_cache"].begin.call_count == 1
+        assert repos["hash_cache"].commit.call_count == 1
+
+    def test_nested(self, unit_of_work: UnitOfWork) -> None:
+        """入れ子のUnit of Workは外側のトランザクションに参加し、外側の書き込みが残る"""
+        with unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+            with unit_of_work.subset(["hash_cache"]) as inner:
+                inner["hash_cache"].upsert([create_hash_cache_entry("a.jpg", "a" * 64)])
+            with unit_of_work:
+                unit_of_work["images"].add([create_image_entry("b.jpg", "b" * 64)])
+            unit_of_work["images"].add([create_image_entry("c.jpg", "c" * 64)])
+
+        assert count_rows(unit_of_work, "images") == 3
+        assert count_rows(unit_of_work, "hash_cache") == 1
+
+    def test_nested_does_not_begin(self) -> None:
+        """入れ子のUnit of Workはトランザクションを開始・コミットしない"""
+        repo = MagicMock(conn=MagicMock())
+        outer = UnitOfWork({"images": repo})
+
+        with outer, outer.subset(["images"]):
+            assert repo.begin.call_count == 1
+            assert repo.commit.call_count == 0
+
+        assert repo.begin.call_count == 1
+        assert repo.commit.call_count == 1
+        assert repo.rollback.call_count == 0
+
+    def test_for_thread(self, unit_of_work: UnitOfWork) -> None:
+        """別スレッド用のUnit of Workは専用の接続で書き込む"""
+        thread_unit_of_work = unit_of_work.for_thread()
+
+        def write() -> None:
+            with thread_unit_of_work:
+                thread_unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+                thread_unit_of_work["hash_cache"].upsert([create_hash_cache_entry("a.jpg", "a" * 64)])
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        thread_unit_of_work.close()
+
+        # 同じ接続を共有していたリポジトリは、専用の接続も共有する
+        assert thread_unit_of_work["images"].conn is thread_unit_of_work["hash_cache"].conn
+        assert thread_unit_of_work["images"].conn is not unit_of_work["images"].conn
+        assert count_rows(unit_of_work, "images") == 1
+        assert count_rows(unit_of_work, "hash_cache") == 1
+
+    def test_independent_units_of_work(self) -> None:
+        """無関係なUnit of Workとはトランザクションの状態を共有しない"""
+        conn = MagicMock()
+        repo, other_repo = MagicMock(conn=conn), MagicMock(conn=conn)
+        outer = UnitOfWork({"images": repo})
+
+        # 同じ接続オブジェクトでも、subsetで作成していないUnit of Workは自身でトランザクションを開始する
+        with outer, UnitOfWork({"images": other_repo}), outer.for_thread():
+            assert repo.begin.call_count == 1
+            assert other_repo.begin.call_count == 1
+
+        assert repo.commit.call_count == 1
+        assert other_repo.commit.call_count == 1
+
+
+class TestUnitOfWorkInvalid:
+    """異常系のテスト
+
+    テストケース:
+        - ブロック内で例外が発生した場合は全リポジトリの書き込みがロールバックされる: test_rollback
+        - リポジトリの例外はロールバック後にそのまま送出される: test_rollback_on_repository_error
+        - 入れ子のUnit of Workの例外は外側でまとめてロールバックされる: test_nested_rollback
+    """
+
+    def test_rollback(self, unit_of_work: UnitOfWork) -> None:
+        """ブロック内で例外が発生した場合は全リポジトリの書き込みがロールバックされる"""
+        with pytest.raises(RuntimeError), unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+            unit_of_work["hash_cache"].upsert([create_hash_cache_entry("a.jpg", "a" * 64)])
+            raise RuntimeError("error")
+
+        assert count_rows(unit_of_work, "images") == 0
+        assert count_rows(unit_of_work, "hash_cache") == 0
+
+    def test_rollback_on_repository_error(self, unit_of_work: UnitOfWork) -> None:
+        """リポジトリの例外はロールバック後にそのまま送出される"""
+        with unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+
+        with pytest.raises(DuplicateImageError), unit_of_work:
+            unit_of_work["hash_cache"].upsert([create_hash_cache_entry("b.jpg", "b" * 64)])
+            unit_of_work["images"].add([create_image_entry("b.jpg", "a" * 64)])
+
+        assert count_rows(unit_of_work, "images") == 1
+        assert count_rows(unit_of_work, "hash_cache") == 0
+
+    def test_nested_rollback(self, unit_of_work: UnitOfWork) -> None:
+        """入れ子のUnit of Workの例外は外側でまとめてロールバックされる"""
+        with pytest.raises(RuntimeError), unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+            with unit_of_work.subset(["hash_cache"]) as inner:
+                inner["hash_cache"].upsert([create_hash_cache_entry("a.jpg", "a" * 64)])
+                raise RuntimeError("error")
+
+        assert count_rows(unit_of_work, "images") == 0
+        assert count_rows(unit_of_work, "hash_cache") == 0
+
+        # ロールバック後も続けて使用できる
+        with unit_of_work:
+            unit_of_work["images"].add([create_image_entry("a.jpg", "a" * 64)])
+
+        assert count_rows(unit_of_work, "images") == 1
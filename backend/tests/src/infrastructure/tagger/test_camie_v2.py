@@ -0,0 +1,70 @@
+"""CamieTaggerV2の前処理のテストモジュール"""
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from PIL import Image, ImageFilter
+
+from infrastructure.tagger.camie_v2 import CamieTaggerV2
+
+
+# JPEGのdraft有無による前処理結果の許容差(0-255の画素値の段階数)
+# draftはDCTスケーリングで縮小してからリサイズするため、全画素を読み込んでから縮小する場合と
+# 補間の結果がわずかに変わる。平均で1段階、最大で8段階までの差を許容する
+DRAFT_MEAN_TOLERANCE = 1.0
+DRAFT_MAX_TOLERANCE = 8.0
+
+
+# ----------------------------
+# Fixtures
+# ----------------------------
+
+
+def create_tagger(use_jpeg_draft: bool) -> CamieTaggerV2:
+    """モデルを読み込まずに前処理のみ行えるCamieTaggerV2を作成するヘルパー関数"""
+    tagger = CamieTaggerV2(model_dir="unused", use_jpeg_draft=use_jpeg_draft)
+    tagger._init_normalization()
+    return tagger
+
+
+@pytest.fixture(scope="module")
+def large_jpeg() -> bytes:
+    """モデル入力サイズより十分大きいJPEG画像"""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(2048, 3072, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels).filter(ImageFilter.GaussianBlur(3))
+    image_bytes = BytesIO()
+    image.save(image_bytes, format="JPEG", quality=90)
+    return image_bytes.getvalue()
+
+
+# ----------------------------
+# Tests
+# ----------------------------
+
+
+class TestCamieTaggerV2PreprocessValid:
+    """正常系のテスト
+
+    テストケース:
+        - draftの有無による前処理結果の差が許容範囲に収まる: test_jpeg_draft_within_tolerance
+        - draftは既定で無効: test_jpeg_draft_disabled_by_default
+    """
+
+    def test_jpeg_draft_within_tolerance(self, large_jpeg: bytes) -> None:
+        """draftの有無による前処理結果の差が許容範囲に収まる"""
+        full = create_tagger(use_jpeg_draft=False)._preprocess_image(large_jpeg)
+        draft = create_tagger(use_jpeg_draft=True)._preprocess_image(large_jpeg)
+
+        assert full.shape == draft.shape == (3, CamieTaggerV2.INPUT_SIZE, CamieTaggerV2.INPUT_SIZE)
+        # 正規化後の値の差を画素値の段階数に戻して比較する
+        std = np.asarray(CamieTaggerV2.NORMALIZE_STD, dtype=np.float32).reshape(3, 1, 1)
+        diff = np.abs(full - draft) * 255.0 * std
+        assert diff.mean() <= DRAFT_MEAN_TOLERANCE
+        assert diff.max() <= DRAFT_MAX_TOLERANCE
+
+    def test_jpeg_draft_disabled_by_default(self) -> None:
+        """draftは既定で無効"""
+        assert CamieTaggerV2(model_dir="unused").use_jpeg_draft is False